@@ -0,0 +1,85 @@
+# Dispatch micro-benchmark: the label -> callback route table (handlers/router.py)
+# against the chain of one regex MessageHandler per button it replaced.
+#
+#   python benchmarks/bench_dispatch.py [--rounds 20000]
+#
+# Measures how long it takes to find the handler for a button press (every
+# label) and to reject free text that matches no button, which in the old
+# layout had to try every regex before falling through.
+
+import argparse
+import datetime
+import importlib
+import os
+import re
+import sys
+import time
+
+from telegram import Chat, Message, Update, User
+from telegram.ext import MessageHandler, filters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+
+def _load_router():
+    os.environ.setdefault("BOT_TOKEN", "123456:BENCH")
+    os.environ["DATABASE_URL"] = "sqlite://" # Importing the handlers sets up the engine; nothing is queried
+    sys.path.insert(0, os.path.dirname(ROOT))
+    return importlib.import_module(f"{PACKAGE}.handlers.router")
+
+def _text_update(text: str) -> Update:
+    message = Message(
+        message_id=1, date=datetime.datetime.now(datetime.timezone.utc), chat=Chat(1, Chat.PRIVATE),
+        from_user=User(1, "Bench", False), text=text,
+    )
+    return Update(1, message=message)
+
+def _regex_chain(router):
+    """One handler per routed label, in the order they used to be registered."""
+    return [
+        (MessageHandler(filters.Regex(f"^{re.escape(label)}$"), callback), callback)
+        for label, callback in router.route_table.items()
+    ]
+
+def _find_in_chain(chain, update):
+    for handler, callback in chain:
+        if handler.check_update(update):
+            return callback
+    return None
+
+def _find_in_table(router, update):
+    if router.button_handler.check_update(update):
+        return router.route_table.get(update.message.text)
+    return None
+
+def _time(find, updates: list, rounds: int) -> float:
+    """Microseconds per update."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for update in updates:
+            find(update)
+    return (time.perf_counter() - started) / (rounds * len(updates)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Route table vs regex handler chain.")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    router = _load_router()
+    chain = _regex_chain(router)
+    buttons = [_text_update(label) for label in router.route_table]
+    free_text = [_text_update(text) for text in ("not watched till the end", "hello", "video was not liked")]
+
+    # Both must agree before timing anything
+    for update in buttons + free_text:
+        assert _find_in_chain(chain, update) is _find_in_table(router, update)
+
+    print(f"{len(router.route_table)} routes, {args.rounds} rounds")
+    print(f"{'case':<12} {'regex chain us':>15} {'route table us':>15} {'speedup':>8}")
+    for name, updates in (("buttons", buttons), ("free text", free_text)):
+        regex = _time(lambda update: _find_in_chain(chain, update), updates, args.rounds)
+        table = _time(lambda update: _find_in_table(router, update), updates, args.rounds)
+        print(f"{name:<12} {regex:>15.2f} {table:>15.2f} {regex / table:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Read-path benchmark: the NamedTuple record readers (db.get_user,
+# db.get_task_by_id) against the ORM lookups they replaced
+# (db.query(...).first() returning mapped objects).
+#
+#   python benchmarks/bench_reads.py [--rows 2000] [--lookups 20000]
+#
+# Reports time per lookup and the memory allocated per lookup (tracemalloc),
+# on a fresh SQLite database seeded with `--rows` users and tasks.
+
+import argparse
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+
+def _load(data_dir: str):
+    os.environ.setdefault("BOT_TOKEN", "123456:BENCH")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(data_dir, 'bot.db')}"
+    sys.path.insert(0, os.path.dirname(ROOT))
+    db = importlib.import_module(f"{PACKAGE}.database.db")
+    models = importlib.import_module(f"{PACKAGE}.database.models")
+    db.init_db()
+    return db, models
+
+def _seed(db, models, rows: int):
+    with db.get_db() as session:
+        session.add_all(models.User(user_id=user_id, username=f"user{user_id}") for user_id in range(1, rows + 1))
+        session.add(models.Video(owner_id=1, title="Benchmark", thumbnail_file_id="thumb", link="https://example.com/v", length_minutes=1, process_instructions="Watch it"))
+        session.flush()
+        video_id = session.query(models.Video.id).scalar()
+        session.add_all(models.Task(video_id=video_id, viewer_id=user_id, status='proof_submitted') for user_id in range(2, rows + 1))
+        session.commit()
+        return [task_id for (task_id,) in session.query(models.Task.id)]
+
+def _orm_user(db, models, user_id):
+    with db.get_db() as session:
+        return session.query(models.User).filter_by(user_id=user_id).first()
+
+def _orm_task(db, models, task_id):
+    with db.get_db() as session:
+        return session.query(models.Task).filter_by(id=task_id).first()
+
+def _measure(lookup, keys: list) -> tuple:
+    """Returns (microseconds per lookup, bytes allocated per lookup, peak bytes)."""
+    for key in keys[:100]: # Warm up statement caches
+        lookup(key)
+    started = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sample = keys[:1000]
+    results = [lookup(key) for key in sample] # Kept alive so the records themselves are counted
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return elapsed / len(keys) * 1e6, (current - before) / len(sample), peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Record readers vs ORM .first() lookups.")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-reads-") as data_dir:
+        db, models = _load(data_dir)
+        task_ids = _seed(db, models, args.rows)
+        rng = random.Random(0)
+        user_keys = [rng.randint(1, args.rows) for _ in range(args.lookups)]
+        task_keys = [rng.choice(task_ids) for _ in range(args.lookups)]
+
+        cases = [
+            ("get_user", lambda key: db.get_user(key), user_keys),
+            ("query(User).first()", lambda key: _orm_user(db, models, key), user_keys),
+            ("get_task_by_id", lambda key: db.get_task_by_id(key), task_keys),
+            ("query(Task).first()", lambda key: _orm_task(db, models, key), task_keys),
+        ]
+        print(f"{args.lookups} lookups over {args.rows} rows")
+        print(f"{'reader':<22} {'us/lookup':>10} {'bytes/lookup':>13} {'peak KiB':>9}")
+        for name, lookup, keys in cases:
+            per_lookup, allocated, peak = _measure(lookup, keys)
+            print(f"{name:<22} {per_lookup:>10.1f} {allocated:>13.0f} {peak / 1024:>9.0f}")
+        db.engine.dispose()
+
+if __name__ == "__main__":
+    main()
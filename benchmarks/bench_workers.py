@@ -0,0 +1,195 @@
+# Scaling benchmark for the sharded worker runtime (workers.py).
+#
+# Starts a stub Bot API server, then runs the bot with 1..N workers against it.
+# The stub hands out synthetic /start updates from many users once the bot is
+# ready and counts the replies, so each run measures end-to-end throughput:
+# polling, routing, handler, database write and the sendMessage call.
+#
+#   python benchmarks/bench_workers.py [--updates 3000] [--users 1000] [--max-workers 4]
+#
+# Uses a fresh SQLite database per run. Nothing is sent to Telegram.
+
+import argparse
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+TOKEN = "123456:BENCH"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+def synthetic_updates(count: int, users: int) -> list:
+    now = int(time.time())
+    updates = []
+    for update_id in range(1, count + 1):
+        user_id = 1_000_000 + update_id % users
+        updates.append({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": now,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+                "text": "/start",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            },
+        })
+    return updates
+
+class StubBotAPI:
+    """Serves getUpdates from a fixed list once released and counts sendMessage calls."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.updates = []
+        self.released = threading.Event()
+        self.replies = 0
+        self.done = threading.Event()
+        self.first_served_at = None
+
+    def reset(self, updates: list):
+        with self.lock:
+            self.updates = updates
+            self.replies = 0
+            self.first_served_at = None
+        self.released.clear()
+        self.done.clear()
+
+    def get_updates(self, params: dict) -> list:
+        if not self.released.wait(timeout=min(float(params.get("timeout") or 0), 1.0)):
+            return []
+        offset = int(params.get("offset") or 0)
+        with self.lock:
+            batch = [update for update in self.updates if update["update_id"] >= offset][:100]
+            if batch and self.first_served_at is None:
+                self.first_served_at = time.perf_counter()
+        if not batch:
+            time.sleep(min(float(params.get("timeout") or 0), 1.0))
+        return batch
+
+    def send_message(self, params: dict) -> dict:
+        with self.lock:
+            self.replies += 1
+            message_id = self.replies
+            if self.replies >= len(self.updates):
+                self.done.set()
+        chat_id = int(params["chat_id"])
+        return {
+            "message_id": message_id, "date": int(time.time()), "from": BOT_USER,
+            "chat": {"id": chat_id, "type": "private"}, "text": params.get("text", ""),
+        }
+
+    def handle(self, method: str, params: dict):
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return self.get_updates(params)
+        if method == "sendMessage":
+            return self.send_message(params)
+        return True
+
+def serve(api: StubBotAPI) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                params = json.loads(body or "{}")
+            else:
+                params = {key: values[0] for key, values in parse_qs(body).items()}
+            method = self.path.rsplit("/", 1)[-1]
+            payload = json.dumps({"ok": True, "result": api.handle(method, params)}).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass # A long poll the bot cancelled while shutting down
+
+        do_GET = do_POST
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _wait_until_ready(process, workers: int, timeout: float) -> bool:
+    """Reads the bot's log until every worker (or the single process) is serving."""
+    ready = 0
+    pattern = re.compile(r"Worker \d+ ready" if workers > 1 else r"Application started")
+    found = threading.Event()
+
+    def read():
+        nonlocal ready
+        for line in process.stderr:
+            if pattern.search(line):
+                ready += 1
+                if ready >= workers:
+                    found.set()
+    threading.Thread(target=read, daemon=True).start()
+    return found.wait(timeout)
+
+def run_once(api: StubBotAPI, base_url: str, workers: int, updates: list, timeout: float) -> float:
+    api.reset(updates)
+    with tempfile.TemporaryDirectory(prefix="bench-workers-") as data_dir:
+        env = dict(
+            os.environ,
+            BOT_TOKEN=TOKEN,
+            BOT_API_URL=base_url,
+            BOT_WORKERS=str(workers),
+            DATABASE_URL=f"sqlite:///{os.path.join(data_dir, 'bot.db')}",
+            EVENT_EXPORT_DIR=os.path.join(data_dir, "event_log"),
+        )
+        code = f"import sys; sys.path.insert(0, {os.path.dirname(ROOT)!r}); from {PACKAGE}.main import main; main()"
+        process = subprocess.Popen([sys.executable, "-c", code], cwd=data_dir, env=env, stderr=subprocess.PIPE, text=True)
+        try:
+            if not _wait_until_ready(process, workers, timeout):
+                raise RuntimeError(f"Bot with {workers} workers did not start within {timeout}s")
+            api.released.set()
+            if not api.done.wait(timeout):
+                raise RuntimeError(f"Only {api.replies}/{len(updates)} replies within {timeout}s")
+            return time.perf_counter() - api.first_served_at
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the bot with 1..N workers against a stub Bot API.")
+    parser.add_argument("--updates", type=int, default=3000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    api = StubBotAPI()
+    server = serve(api)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/bot"
+    updates = synthetic_updates(args.updates, args.users)
+
+    print(f"{args.updates} updates from {args.users} users, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'updates/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        seconds = run_once(api, base_url, workers, updates, args.timeout)
+        throughput = args.updates / seconds
+        baseline = baseline or throughput
+        print(f"{workers:>7} {seconds:>8.2f} {throughput:>10.0f} {throughput / baseline:>7.2f}x")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import os
 # --- BOT CONFIGURATION ---
 # Get your Bot Token from @BotFather on Telegram
 BOT_TOKEN = os.environ.get("BOT_TOKEN", "YOUR_BOT_TOKEN_HERE")
+# Point this at a local Bot API server if you run one (the benchmarks use a stub)
+BOT_API_URL = os.environ.get("BOT_API_URL", "https://api.telegram.org/bot")
 
 # --- ADMIN CONFIGURATION ---
 # Your Telegram User ID (can be a list of multiple admins)
@@ -16,26 +18,61 @@ ADMIN_IDS = [int(admin_id) for admin_id in os.environ.get("ADMIN_IDS", "12345678
 # Using SQLite for simplicity, works well on Termux and VPS.
 # For production, you might want to switch to PostgreSQL.
 DATABASE_NAME = "bot_database.db"
-DATABASE_URL = f"sqlite:///{DATABASE_NAME}"
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DATABASE_NAME}")
+
+
+# --- RUNTIME CONFIGURATION ---
+# With more than one worker, a front process polls Telegram and routes each
+# update to a worker process chosen by the sender's user id (see workers.py).
+WORKER_COUNT = int(os.environ.get("BOT_WORKERS", "1"))
+WORKER_QUEUE_SIZE = 1000 # Updates buffered per worker before the front process waits
+DRAIN_TIMEOUT_SECONDS = float(os.environ.get("DRAIN_TIMEOUT_SECONDS", "20")) # Max time to finish in-flight work on shutdown
+
+
+# --- STARTUP CONFIGURATION ---
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "3")) # A warning is logged when startup takes longer
 
 
 # --- SUBSCRIPTION CONFIGURATION ---
 DEFAULT_SUB_PRICE = 30  # Default price in INR
 TRIAL_PERIOD_DAYS = 3 # Days a new user can use the bot for free before subscription is required
+SUBSCRIPTION_PERIOD_DAYS = 30 # Default length of a grant/extension when the admin doesn't give one
+SUBSCRIPTION_SWEEP_INTERVAL_MINUTES = 10 # How often expired subscriptions are switched off
 
 
 # --- TASK & STRIKE CONFIGURATION ---
 MAX_VIDEOS_PER_USER = 5
 PROOF_REVIEW_TIMEOUT_MINUTES = 20 # Time in minutes for a user to review a proof
+REVIEW_QUEUE_PAGE_SIZE = 10 # Proofs per review page, also Telegram's media album limit
+REVIEW_PAGES_KEPT = 5 # Most recent review digests per owner whose buttons still work
+FINGERPRINT_BACKFILL_BATCH_SIZE = 50 # Old proofs looked up per backfill run (one get_file call each)
+FINGERPRINT_BACKFILL_INTERVAL_SECONDS = 10
 MAX_STRIKES = 4 # Number of strikes before a ban
+TASK_ASSIGNMENT_TIMEOUT_MINUTES = int(os.environ.get("TASK_ASSIGNMENT_TIMEOUT_MINUTES", "120")) # Assigned tasks without proof after this are expired
+TASK_EXPIRY_SWEEP_INTERVAL_MINUTES = 5 # How often the expiry sweeper runs
+TASK_EXPIRY_BATCH_SIZE = 500 # Rows per UPDATE, keeps each write lock short
+
+
+# --- EVENT LOG CONFIGURATION ---
+EVENT_EXPORT_DIR = os.environ.get("EVENT_EXPORT_DIR", "event_log") # Where the outbox writes its JSONL files
+EVENT_EXPORT_INTERVAL_SECONDS = 60
+EVENT_EXPORT_BATCH_SIZE = 1000 # Events per file append + cursor checkpoint
 
 
 # --- BOT SETTINGS (Can be controlled by Admin) ---
 # These are the default values. Admin can change them via bot commands.
+# The live values are stored in the admin_settings table; every process keeps
+# this cached copy and reloads it when the shared settings version changes
+# (see db.refresh_settings).
+SETTINGS_REFRESH_SECONDS = 5 # How often a process checks the settings version
+
 class BotSettings:
     def __init__(self):
-        self.subscription_mode = False
-        self.ai_moderation_mode = False
+        self.subscription_mode: bool = False
+        self.ai_moderation_mode: bool = False
+        self.subscription_price: int = DEFAULT_SUB_PRICE
+        self.version: int = -1 # Settings version this copy was loaded at, -1 = never loaded
+        self.checked_at: float = 0.0 # time.monotonic() of the last version check
 
 # Create a single instance of settings to be used across the bot
 bot_settings = BotSettings()
@@ -1,27 +1,108 @@
 # /bot/database/db.py
 
-from sqlalchemy import create_engine, select, func, and_
+from sqlalchemy import create_engine, select, update, func, and_, inspect, text, bindparam, tuple_, case, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
 import datetime
+import json
+import time
 
-from .models import Base, User, Video, Task, AdminSettings
-from ..config import DATABASE_URL, bot_settings, DEFAULT_SUB_PRICE
+from .models import Base, User, Video, Task, AdminSettings, SchemaVersion, SettingsVersion, StatCounter, DailyStat, ProofFingerprint, Event
+from .records import UserRecord, UserListRecord, VideoRecord, TaskRecord, AssignedTask, ProofFingerprintRecord, UnfingerprintedProof, DuplicateProof
+from ..config import (
+    DATABASE_URL, bot_settings, DEFAULT_SUB_PRICE, TRIAL_PERIOD_DAYS, MAX_VIDEOS_PER_USER, REVIEW_QUEUE_PAGE_SIZE,
+    SETTINGS_REFRESH_SECONDS
+)
+
+_is_sqlite = DATABASE_URL.startswith('sqlite')
+# With several worker processes sharing one SQLite file, wait for the write
+# lock instead of failing straight away
+engine = create_engine(DATABASE_URL, connect_args={'timeout': 30} if _is_sqlite else {})
+
+if _is_sqlite:
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers in other processes carry on while one process writes
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Bump this whenever models.py gains a table, column or index.
+# Startup only touches the schema when the stored version differs.
+SCHEMA_VERSION = 11
+
+# Indexes replaced by newer ones, dropped when the schema is synced
+OBSOLETE_INDEXES = ['ix_users_subscription_expiry']
+
+DEFAULT_SETTINGS = [
+    {'setting_name': 'subscription_mode', 'is_enabled': False, 'value': None},
+    {'setting_name': 'ai_moderation_mode', 'is_enabled': False, 'value': None},
+    {'setting_name': 'subscription_price', 'is_enabled': False, 'value': str(DEFAULT_SUB_PRICE)},
+]
+
+# Brings the database up to SCHEMA_VERSION; True if the schema had to be (re)built
 def init_db():
-    Base.metadata.create_all(bind=engine)
-    # Initialize settings in DB if they don't exist
+    if get_schema_version() == SCHEMA_VERSION:
+        return False
+
+    _sync_schema()
     with get_db() as db:
-        if not db.query(AdminSettings).filter_by(setting_name='subscription_mode').first():
-            db.add(AdminSettings(setting_name='subscription_mode', is_enabled=False))
-        if not db.query(AdminSettings).filter_by(setting_name='ai_moderation_mode').first():
-            db.add(AdminSettings(setting_name='ai_moderation_mode', is_enabled=False))
-        if not db.query(AdminSettings).filter_by(setting_name='subscription_price').first():
-            db.add(AdminSettings(setting_name='subscription_price', value=str(DEFAULT_SUB_PRICE)))
+        # Single statement, leaves admin-changed values alone
+        db.execute(_insert(AdminSettings).values(DEFAULT_SETTINGS).on_conflict_do_nothing(index_elements=['setting_name']))
+        db.merge(SchemaVersion(id=1, version=SCHEMA_VERSION))
         db.commit()
+    return True
+
+# None if the database was never bootstrapped
+def get_schema_version():
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar()
+    except DBAPIError:
+        return None
+
+def _sync_schema():
+    Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add newer columns and indexes by hand
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                        f"{column.type.compile(dialect=engine.dialect)}{_default_clause(column)}"
+                    ))
+            for index in table.indexes:
+                # IF NOT EXISTS rather than checkfirst: reflection can't see expression indexes
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def _default_clause(column):
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ""
+    value = default.arg
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, str):
+        value = "'" + value.replace("'", "''") + "'"
+    return f" DEFAULT {value}"
+
+# Dialect-specific INSERT so callers get on_conflict_do_nothing/do_update
+def _insert(model):
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
 
 
 @contextmanager
@@ -32,25 +113,90 @@ def get_db():
     finally:
         db.close()
 
+# --- Read Models ---
+# Hot reads select only the columns the handlers use and return the
+# named tuples from records.py. Statements are built once at import time.
+_USER_BY_ID = select(
+    User.user_id, User.username, User.status, User.strikes, User.is_subscribed, User.subscription_expiry,
+    User.tasks_given, User.tasks_completed, User.tasks_rejected, User.tasks_pending_review, User.views_received
+).where(User.user_id == bindparam('user_id'))
+
+_ACTIVE_VIDEO_COUNT = select(func.count(Video.id)).where(
+    Video.owner_id == bindparam('owner_id'), Video.is_active == True
+)
+
+_ACTIVE_VIDEOS_BY_OWNER = select(
+    Video.id, Video.title, Video.is_active, Video.views_received
+).where(
+    Video.owner_id == bindparam('owner_id'), Video.is_active == True
+).order_by(Video.id).limit(bindparam('limit'))
+
+# Columns of a TaskRecord, in field order
+_TASK_COLUMNS = (
+    Task.id, Task.video_id, Task.viewer_id, Task.status, Task.proof_file_id, Task.proof_type,
+    Video.owner_id, Video.title
+)
+
+_TASK_BY_ID = select(*_TASK_COLUMNS).join(Video, Task.video_id == Video.id).where(Task.id == bindparam('task_id'))
+
+_FINGERPRINT_BY_UNIQUE_ID = select(
+    ProofFingerprint.task_id, ProofFingerprint.viewer_id, ProofFingerprint.file_size, ProofFingerprint.duration
+).where(ProofFingerprint.file_unique_id == bindparam('file_unique_id'))
+
+# One INSERT in the caller's transaction; events are dicts with event_type and optional task_id, user_id, video_id, data
+def _log_events(db, events: list):
+    if not events:
+        return
+    now = datetime.datetime.utcnow()
+    db.execute(Event.__table__.insert(), [{
+        'event_type': event['event_type'],
+        'task_id': event.get('task_id'),
+        'user_id': event.get('user_id'),
+        'video_id': event.get('video_id'),
+        'data': json.dumps(event['data']) if event.get('data') else None,
+        'created_at': now,
+    } for event in events])
+
+# First row of `statement` as `record`, or None
+def _fetch_one(record, statement, conn=None, **params):
+    if conn is None:
+        with engine.connect() as conn:
+            row = conn.execute(statement, params).first()
+    else:
+        row = conn.execute(statement, params).first()
+    return record._make(row) if row else None
+
 # --- User Functions ---
 def get_or_create_user(user_id: int, username: str = None):
     with get_db() as db:
         user = db.query(User).filter_by(user_id=user_id).first()
         if not user:
-            user = User(user_id=user_id, username=username)
+            user = User(
+                user_id=user_id,
+                username=username,
+                is_subscribed=True,
+                subscription_expiry=datetime.datetime.utcnow() + datetime.timedelta(days=TRIAL_PERIOD_DAYS)
+            )
             db.add(user)
+            _bump_counters(db, {'users_total': 1, 'users_active': 1})
             db.commit()
             db.refresh(user)
         return user
 
 def get_user(user_id: int):
-    with get_db() as db:
-        return db.query(User).filter_by(user_id=user_id).first()
+    return _fetch_one(UserRecord, _USER_BY_ID, user_id=user_id)
 
 def update_user_status(user_id: int, status: str):
     with get_db() as db:
         user = db.query(User).filter_by(user_id=user_id).first()
         if user:
+            if user.status != status:
+                _bump_counters(db, {f'users_{user.status}': -1, f'users_{status}': 1})
+                _log_events(db, [{
+                    'event_type': 'ban' if status == 'banned' else 'status_changed',
+                    'user_id': user_id,
+                    'data': {'from': user.status, 'to': status},
+                }])
             user.status = status
             db.commit()
         return user
@@ -60,9 +206,103 @@ def add_strike(user_id: int, count: int = 1):
         user = db.query(User).filter_by(user_id=user_id).first()
         if user:
             user.strikes += count
+            _bump_counters(db, {'strikes_total': count})
+            _log_events(db, [{'event_type': 'strike', 'user_id': user_id, 'data': {'count': count, 'total': user.strikes}}])
             db.commit()
         return user.strikes if user else 0
 
+USER_PAGE_SIZE = 10
+
+# Keyset page of the admin user browser: ([(UserListRecord, key), ...], has_more) in display order
+def get_users_page(status: str = None, min_strikes: int = None, username_prefix: str = None,
+                   after: tuple = None, before: tuple = None, limit: int = USER_PAGE_SIZE):
+    # Sorted by the most selective filter so each page is a range scan on one users index
+    if username_prefix:
+        key_columns = (func.lower(User.username), User.id)
+    elif min_strikes:
+        key_columns = (User.strikes, User.id)
+    else:
+        key_columns = (User.id,)
+    key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+
+    def key_value(cursor):
+        return tuple_(*cursor) if len(key_columns) > 1 else cursor[0]
+
+    statement = select(User.id, User.user_id, User.username, User.status, User.strikes, *key_columns)
+    if status:
+        statement = statement.where(User.status == status)
+    if min_strikes:
+        statement = statement.where(User.strikes >= min_strikes)
+    if username_prefix:
+        prefix = username_prefix.lstrip('@').lower()
+        # A range instead of LIKE so the expression index is used
+        statement = statement.where(func.lower(User.username) >= prefix, func.lower(User.username) < prefix + '\uffff')
+
+    if before is not None:
+        statement = statement.where(key < key_value(before)).order_by(*(column.desc() for column in key_columns))
+    else:
+        if after is not None:
+            statement = statement.where(key > key_value(after))
+        statement = statement.order_by(*key_columns)
+
+    with engine.connect() as conn:
+        rows = conn.execute(statement.limit(limit + 1)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if before is not None:
+        rows.reverse()
+    return [(UserListRecord._make(row[:5]), tuple(row[5:])) for row in rows], has_more
+
+# Adjusts a user's activity counters inside the caller's transaction
+def _bump_user(db, user_id: int, **deltas):
+    db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values({name: getattr(User, name) + delta for name, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+# --- Subscription Functions ---
+# Fresh subscription of `days` days from now; returns the new expiry or None
+def grant_subscription(user_id: int, days: int):
+    with get_db() as db:
+        user = db.query(User).filter_by(user_id=user_id).first()
+        if not user:
+            return None
+        user.subscription_expiry = datetime.datetime.utcnow() + datetime.timedelta(days=days)
+        user.is_subscribed = True
+        db.commit()
+        return user.subscription_expiry
+
+# Adds `days` to the current expiry, or to now if it lapsed; returns the new expiry or None
+def extend_subscription(user_id: int, days: int):
+    with get_db() as db:
+        user = db.query(User).filter_by(user_id=user_id).first()
+        if not user:
+            return None
+        now = datetime.datetime.utcnow()
+        start = user.subscription_expiry if user.subscription_expiry and user.subscription_expiry > now else now
+        user.subscription_expiry = start + datetime.timedelta(days=days)
+        user.is_subscribed = True
+        db.commit()
+        return user.subscription_expiry
+
+# Switches off every lapsed subscription in one UPDATE; returns the number of users flipped
+def expire_subscriptions():
+    with get_db() as db:
+        result = db.execute(
+            update(User)
+            .where(
+                User.is_subscribed == True,
+                (User.subscription_expiry == None) | (User.subscription_expiry <= datetime.datetime.utcnow())
+            )
+            .values(is_subscribed=False)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
 # --- Video Functions ---
 def add_video(owner_id: int, title: str, thumbnail_file_id: str, link: str, length_minutes: int, instructions: str):
     with get_db() as db:
@@ -75,24 +315,28 @@ def add_video(owner_id: int, title: str, thumbnail_file_id: str, link: str, leng
             process_instructions=instructions
         )
         db.add(new_video)
+        _bump_counters(db, {'videos_total': 1, 'videos_active': 1})
         db.commit()
         db.refresh(new_video)
         return new_video
 
 def count_user_videos(user_id: int):
-    with get_db() as db:
-        return db.query(Video).filter_by(owner_id=user_id, is_active=True).count()
+    with engine.connect() as conn:
+        return conn.execute(_ACTIVE_VIDEO_COUNT, {'owner_id': user_id}).scalar()
 
-def get_user_videos(user_id: int):
-    with get_db() as db:
-        return db.query(Video).filter_by(owner_id=user_id).all()
+# The user's active videos, at most `limit` of them
+def get_user_videos(user_id: int, limit: int = MAX_VIDEOS_PER_USER):
+    with engine.connect() as conn:
+        rows = conn.execute(_ACTIVE_VIDEOS_BY_OWNER, {'owner_id': user_id, 'limit': limit})
+        return [VideoRecord._make(row) for row in rows]
 
 # --- Task Functions ---
 def get_task_for_user(viewer_id: int):
     with get_db() as db:
         # Find a video this user hasn't seen yet and is not their own video
         # and the owner is active
-        subquery = select(Task.video_id).where(Task.viewer_id == viewer_id)
+        # Expired tasks don't count, so an abandoned video can be handed out again
+        subquery = select(Task.video_id).where(Task.viewer_id == viewer_id, Task.status != 'expired')
 
         video = db.query(Video).join(User, Video.owner_id == User.user_id)\
             .filter(Video.owner_id != viewer_id,
@@ -106,23 +350,87 @@ def get_task_for_user(viewer_id: int):
 
         new_task = Task(video_id=video.id, viewer_id=viewer_id)
         db.add(new_task)
+        db.flush()
+        assigned = AssignedTask(
+            id=new_task.id,
+            video_id=video.id,
+            title=video.title,
+            length_minutes=video.length_minutes,
+            process_instructions=video.process_instructions,
+            link=video.link,
+            thumbnail_file_id=video.thumbnail_file_id
+        )
+        _bump_counters(db, {'tasks_assigned': 1})
+        _bump_user(db, viewer_id, tasks_given=1)
+        _log_events(db, [{'event_type': 'assigned', 'task_id': new_task.id, 'user_id': viewer_id, 'video_id': video.id}])
         db.commit()
-        db.refresh(new_task)
-        return new_task
+        return assigned
 
 def get_task_by_id(task_id: int):
-    with get_db() as db:
-        return db.query(Task).filter_by(id=task_id).first()
+    return _fetch_one(TaskRecord, _TASK_BY_ID, task_id=task_id)
 
-def update_task_with_proof(task_id: int, proof_file_id: str, proof_type: str):
+def update_task_with_proof(task_id: int, proof_file_id: str, proof_type: str,
+                           file_unique_id: str = None, file_size: int = None, duration: int = None):
     with get_db() as db:
-        task = db.query(Task).filter_by(id=task_id).first()
+        task = db.query(Task).filter_by(id=task_id, status='assigned').first()
         if task:
             task.status = 'proof_submitted'
             task.proof_file_id = proof_file_id
             task.proof_type = proof_type
+            if file_unique_id:
+                inserted = _add_fingerprints(db, [{
+                    'file_unique_id': file_unique_id, 'task_id': task_id, 'viewer_id': task.viewer_id,
+                    'file_size': file_size, 'duration': duration,
+                }])
+                # Another submission of the same file committed since the caller's lookup
+                if not inserted:
+                    first = db.execute(select(ProofFingerprint.task_id).where(ProofFingerprint.file_unique_id == file_unique_id)).scalar()
+                    if first != task_id:
+                        db.rollback()
+                        return DuplicateProof(task_id, first)
+            _bump_counters(db, {'tasks_assigned': -1, 'tasks_proof_submitted': 1})
+            _bump_user(db, task.viewer_id, tasks_pending_review=1)
+            _log_events(db, [{
+                'event_type': 'proof_submitted', 'task_id': task_id, 'user_id': task.viewer_id, 'video_id': task.video_id,
+                'data': {'proof_type': proof_type, 'file_unique_id': file_unique_id},
+            }])
             db.commit()
-        return task
+            return _fetch_one(TaskRecord, _TASK_BY_ID, conn=db.connection(), task_id=task_id)
+        return None
+
+# --- Proof Fingerprints ---
+# ProofFingerprintRecord for a proof file, or None
+def find_proof_fingerprint(file_unique_id: str):
+    return _fetch_one(ProofFingerprintRecord, _FINGERPRINT_BY_UNIQUE_ID, file_unique_id=file_unique_id)
+
+# Keeps the first task that used a file; returns rows inserted
+def _add_fingerprints(db, rows: list):
+    result = db.execute(_insert(ProofFingerprint).values(rows).on_conflict_do_nothing(index_elements=['file_unique_id']))
+    return result.rowcount
+
+# Tasks with a proof but no fingerprint yet, keyset-paginated on task id
+def get_unfingerprinted_proofs(after_task_id: int = 0, limit: int = 50):
+    statement = (
+        select(Task.id, Task.viewer_id, Task.proof_file_id)
+        .where(
+            Task.id > after_task_id,
+            Task.proof_file_id != None,
+            ~select(ProofFingerprint.id).where(ProofFingerprint.task_id == Task.id).exists()
+        )
+        .order_by(Task.id)
+        .limit(limit)
+    )
+    with engine.connect() as conn:
+        return [UnfingerprintedProof._make(row) for row in conn.execute(statement)]
+
+# Backfill; returns how many were new, the rest were files already used by an earlier task
+def add_proof_fingerprints(rows: list):
+    if not rows:
+        return 0
+    with get_db() as db:
+        inserted = _add_fingerprints(db, rows)
+        db.commit()
+        return inserted
 
 def complete_task(task_id: int):
     with get_db() as db:
@@ -132,44 +440,340 @@ def complete_task(task_id: int):
             video = db.query(Video).filter_by(id=task.video_id).first()
             if video:
                 video.views_received += 1
+                _bump_user(db, video.owner_id, views_received=1)
+            _bump_user(db, task.viewer_id, tasks_pending_review=-1, tasks_completed=1)
+            _log_events(db, [{'event_type': 'completed', 'task_id': task.id, 'user_id': task.viewer_id, 'video_id': task.video_id}])
+            _bump_counters(db, {'tasks_proof_submitted': -1, 'tasks_completed': 1})
+            _bump_daily(db, datetime.datetime.utcnow().date(), completions=1)
             db.commit()
             return True
         return False
         
+# Rejects a proof still awaiting review; None if it doesn't exist or was already reviewed
 def invalidate_task(task_id: int, reason: str):
-     with get_db() as db:
-        task = db.query(Task).filter_by(id=task_id).first()
-        if task:
-            task.status = 'invalid_proof'
-            task.rejection_reason = reason
+    with get_db() as db:
+        task = _fetch_one(TaskRecord, _TASK_BY_ID, conn=db.connection(), task_id=task_id)
+        if not task or task.status != 'proof_submitted':
+            return None
+        # Guarded in the UPDATE as well, another worker may review it in between
+        changed = db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.status == 'proof_submitted')
+            .values(status='invalid_proof', rejection_reason=reason, updated_at=datetime.datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not changed:
+            return None
+        _bump_counters(db, {'tasks_proof_submitted': -1, 'tasks_invalid_proof': 1})
+        _bump_daily(db, datetime.datetime.utcnow().date(), rejections=1)
+        _bump_user(db, task.viewer_id, tasks_rejected=1, tasks_pending_review=-1)
+        _log_events(db, [{
+            'event_type': 'invalid', 'task_id': task.id, 'user_id': task.viewer_id, 'video_id': task.video_id,
+            'data': {'reason': reason},
+        }])
+        db.commit()
+        return task._replace(status='invalid_proof')
+
+# Expires old 'assigned' tasks, committing per batch; returns the (task_id, viewer_id) pairs expired
+def expire_stale_tasks(older_than: datetime.datetime, batch_size: int):
+    expired = []
+    while True:
+        with get_db() as db:
+            # Served by ix_tasks_status_created_at
+            rows = db.execute(
+                select(Task.id, Task.viewer_id, Task.video_id)
+                .where(Task.status == 'assigned', Task.created_at < older_than)
+                .order_by(Task.created_at)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            # A task can get its proof between the SELECT and the UPDATE;
+            # RETURNING reports only the rows that were really expired
+            changed = db.execute(
+                update(Task)
+                .where(Task.id.in_([row.id for row in rows]), Task.status == 'assigned')
+                .values(status='expired', updated_at=datetime.datetime.utcnow())
+                .returning(Task.id, Task.viewer_id, Task.video_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            _bump_counters(db, {'tasks_assigned': -len(changed), 'tasks_expired': len(changed)})
+            _log_events(db, [
+                {'event_type': 'expired', 'task_id': row.id, 'user_id': row.viewer_id, 'video_id': row.video_id}
+                for row in changed
+            ])
             db.commit()
-        return task
+            expired.extend((row.id, row.viewer_id) for row in changed)
+
+        if len(rows) < batch_size:
+            break
+    return expired
+
+# An owner's proofs awaiting review, oldest first, keyset-paginated on task id
+def get_pending_proofs_for_owner(owner_id: int, after_id: int = None, limit: int = REVIEW_QUEUE_PAGE_SIZE):
+    # Filtering on the owner's video ids (ix_videos_owner_id) lets the planner probe
+    # ix_tasks_video_id_status per video instead of every proof awaiting review
+    owner_videos = select(Video.id).where(Video.owner_id == owner_id)
+    statement = (
+        select(*_TASK_COLUMNS)
+        .join(Video, Task.video_id == Video.id)
+        .where(Task.video_id.in_(owner_videos), Task.status == 'proof_submitted')
+        .order_by(Task.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        statement = statement.where(Task.id > after_id)
+    with engine.connect() as conn:
+        return [TaskRecord._make(row) for row in conn.execute(statement)]
+
+# Counts the SQL statements the session sends while the block runs
+@contextmanager
+def _count_statements(db):
+    counter = {'statements': 0}
+    def before_cursor_execute(*args):
+        counter['statements'] += 1
+    conn = db.connection()
+    event.listen(conn, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(conn, 'before_cursor_execute', before_cursor_execute)
+
+# Bulk approval with a fixed number of statements; returns (completed TaskRecords, statements used)
+def complete_tasks(task_ids: list, owner_id: int):
+    with get_db() as db, _count_statements(db) as counter:
+        tasks = [TaskRecord._make(row) for row in db.execute(
+            select(*_TASK_COLUMNS)
+            .join(Video, Task.video_id == Video.id)
+            .where(Task.id.in_(task_ids), Video.owner_id == owner_id, Task.status == 'proof_submitted')
+        )]
+        if not tasks:
+            return [], counter['statements']
+
+        # Only the rows this UPDATE changed count; another worker may have reviewed some in between
+        changed = set(db.execute(
+            update(Task)
+            .where(Task.id.in_([task.id for task in tasks]), Task.status == 'proof_submitted')
+            .values(status='completed', updated_at=datetime.datetime.utcnow())
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        tasks = [task._replace(status='completed') for task in tasks if task.id in changed]
+        if not tasks:
+            db.rollback()
+            return [], counter['statements']
+
+        views_per_video = {}
+        completed_per_viewer = {}
+        for task in tasks:
+            views_per_video[task.video_id] = views_per_video.get(task.video_id, 0) + 1
+            completed_per_viewer[task.viewer_id] = completed_per_viewer.get(task.viewer_id, 0) + 1
+
+        db.execute(
+            update(Video)
+            .where(Video.id.in_(views_per_video))
+            .values(views_received=Video.views_received + case(views_per_video, value=Video.id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        viewer_delta = case(completed_per_viewer, value=User.user_id, else_=0)
+        db.execute(
+            update(User)
+            .where(User.user_id.in_(completed_per_viewer))
+            .values(
+                tasks_pending_review=User.tasks_pending_review - viewer_delta,
+                tasks_completed=User.tasks_completed + viewer_delta
+            )
+            .execution_options(synchronize_session=False)
+        )
+        _bump_user(db, owner_id, views_received=len(tasks))
+        _bump_counters(db, {'tasks_proof_submitted': -len(tasks), 'tasks_completed': len(tasks)})
+        _bump_daily(db, datetime.datetime.utcnow().date(), completions=len(tasks))
+        _log_events(db, [
+            {'event_type': 'completed', 'task_id': task.id, 'user_id': task.viewer_id, 'video_id': task.video_id, 'data': {'bulk': True}}
+            for task in tasks
+        ])
+        db.commit()
+        return tasks, counter['statements']
+
+# (task_id, viewer_id, submitted_at) of every proof awaiting review, to reschedule its timeout
+def get_pending_proof_timeouts():
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(
+            select(Task.id, Task.viewer_id, func.coalesce(Task.updated_at, Task.created_at))
+            .where(Task.status == 'proof_submitted')
+        )]
+
+# --- Stats Rollups ---
+STATS_HISTORY_DAYS = 7 # Days of per-day history shown in the admin panel
+
+# Adds each delta to its named counter inside the caller's transaction
+def _bump_counters(db, deltas: dict):
+    values = [{'name': name, 'value': delta} for name, delta in deltas.items() if delta]
+    if not values:
+        return
+    statement = _insert(StatCounter).values(values)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'value': StatCounter.value + statement.excluded.value}
+    ))
+
+def _bump_daily(db, day: datetime.date, completions: int = 0, rejections: int = 0):
+    statement = _insert(DailyStat).values(day=day, completions=completions, rejections=rejections)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=['day'],
+        set_={
+            'completions': DailyStat.completions + statement.excluded.completions,
+            'rejections': DailyStat.rejections + statement.excluded.rejections,
+        }
+    ))
+
+# (counters dict, [(day, completions, rejections), ...] newest first) from the rollups
+def get_stats():
+    since = datetime.datetime.utcnow().date() - datetime.timedelta(days=STATS_HISTORY_DAYS - 1)
+    with engine.connect() as conn:
+        counters = dict(conn.execute(select(StatCounter.name, StatCounter.value)).all())
+        daily = conn.execute(
+            select(DailyStat.day, DailyStat.completions, DailyStat.rejections)
+            .where(DailyStat.day >= since)
+            .order_by(DailyStat.day.desc())
+        ).all()
+    return counters, [tuple(row) for row in daily]
+
+# Recomputes every user's activity counters with one correlated UPDATE
+def _rebuild_user_counters(db):
+    def viewer_tasks(*conditions):
+        # Served by ix_tasks_viewer_id_status
+        return select(func.count(Task.id)).where(Task.viewer_id == User.user_id, *conditions).scalar_subquery()
+
+    db.execute(
+        update(User).values(
+            tasks_given=viewer_tasks(),
+            tasks_completed=viewer_tasks(Task.status == 'completed'),
+            tasks_rejected=viewer_tasks(Task.status == 'invalid_proof'),
+            tasks_pending_review=viewer_tasks(Task.status == 'proof_submitted'),
+            views_received=select(func.coalesce(func.sum(Video.views_received), 0))
+                .where(Video.owner_id == User.user_id).scalar_subquery(),
+        ).execution_options(synchronize_session=False)
+    )
+
+def _lock_rollups(db):
+    # Rollup writers wait until the rebuild commits, so none of their bumps is overwritten
+    if _is_sqlite:
+        db.execute(text("BEGIN IMMEDIATE"))
+    else:
+        db.execute(text("LOCK TABLE stat_counters, daily_stats IN EXCLUSIVE MODE"))
+
+# Recomputes the rollups and user counters from the live tables; returns the rebuilt counters
+def rebuild_stats(chunk_size: int = 1000):
+    counters = {}
+    daily = {}
+
+    def add(name, amount=1):
+        counters[name] = counters.get(name, 0) + amount
 
-def get_pending_proof_task_for_owner(owner_id: int):
     with get_db() as db:
-        return db.query(Task).join(Video).filter(
-            Video.owner_id == owner_id,
-            Task.status == 'proof_submitted'
-        ).first()
+        _lock_rollups(db)
+        conn = db.connection()
+        streaming = {'stream_results': True, 'yield_per': chunk_size}
+        for status, strikes in conn.execute(select(User.status, User.strikes), execution_options=streaming):
+            add('users_total')
+            add(f'users_{status}')
+            add('strikes_total', strikes or 0)
+
+        for (is_active,) in conn.execute(select(Video.is_active), execution_options=streaming):
+            add('videos_total')
+            if is_active:
+                add('videos_active')
+
+        for status, created_at, updated_at in conn.execute(select(Task.status, Task.created_at, Task.updated_at), execution_options=streaming):
+            add(f'tasks_{status}')
+            if status in ('completed', 'invalid_proof'):
+                day = (updated_at or created_at).date()
+                completions, rejections = daily.get(day, (0, 0))
+                if status == 'completed':
+                    completions += 1
+                else:
+                    rejections += 1
+                daily[day] = (completions, rejections)
+
+        _rebuild_user_counters(db)
+        db.execute(StatCounter.__table__.delete())
+        db.execute(DailyStat.__table__.delete())
+        if counters:
+            db.execute(StatCounter.__table__.insert(), [{'name': name, 'value': value} for name, value in counters.items()])
+        if daily:
+            db.execute(DailyStat.__table__.insert(), [
+                {'day': day, 'completions': completions, 'rejections': rejections}
+                for day, (completions, rejections) in daily.items()
+            ])
+        db.commit()
+    return counters
 
 # --- Admin Settings Functions ---
+_SETTINGS_VERSION = select(SettingsVersion.version).where(SettingsVersion.id == 1)
+
+def _apply_setting(name: str, is_enabled: bool, value: str):
+    if name == 'subscription_mode':
+        bot_settings.subscription_mode = bool(is_enabled)
+    elif name == 'ai_moderation_mode':
+        bot_settings.ai_moderation_mode = bool(is_enabled)
+    elif name == 'subscription_price':
+        try:
+            bot_settings.subscription_price = int(value)
+        except (TypeError, ValueError):
+            bot_settings.subscription_price = DEFAULT_SUB_PRICE
+
+# Reloads every setting and the settings version into bot_settings
 def load_settings():
-    with get_db() as db:
-        settings = db.query(AdminSettings).all()
-        for setting in settings:
-            if setting.setting_name == 'subscription_mode':
-                bot_settings.subscription_mode = setting.is_enabled
-            elif setting.setting_name == 'ai_moderation_mode':
-                bot_settings.ai_moderation_mode = setting.is_enabled
+    with engine.connect() as conn:
+        # Version first: a change committed in between just triggers another reload later
+        version = conn.execute(_SETTINGS_VERSION).scalar() or 0
+        rows = conn.execute(select(AdminSettings.setting_name, AdminSettings.is_enabled, AdminSettings.value)).all()
+    for name, is_enabled, value in rows:
+        _apply_setting(name, is_enabled, value)
+    bot_settings.version = version
+    bot_settings.checked_at = time.monotonic()
 
-def update_setting(setting_name: str, is_enabled: bool):
+# Reloads the settings if settings_version moved; checked at most every SETTINGS_REFRESH_SECONDS unless forced
+def refresh_settings(force: bool = False):
+    if not force and time.monotonic() - bot_settings.checked_at < SETTINGS_REFRESH_SECONDS:
+        return False
+    with engine.connect() as conn:
+        version = conn.execute(_SETTINGS_VERSION).scalar() or 0
+    bot_settings.checked_at = time.monotonic()
+    if version == bot_settings.version:
+        return False
+    load_settings()
+    return True
+
+def _bump_settings_version(db):
+    statement = _insert(SettingsVersion).values(id=1, version=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=['id'],
+        set_={'version': SettingsVersion.version + 1}
+    ))
+    return db.execute(_SETTINGS_VERSION).scalar()
+
+def _save_setting(setting_name: str, **values):
     with get_db() as db:
         setting = db.query(AdminSettings).filter_by(setting_name=setting_name).first()
-        if setting:
-            setting.is_enabled = is_enabled
-            db.commit()
-            # Update live settings object
-            if setting_name == 'subscription_mode':
-                bot_settings.subscription_mode = is_enabled
-            elif setting_name == 'ai_moderation_mode':
-                bot_settings.ai_moderation_mode = is_enabled
+        if not setting:
+            return False
+        for column, value in values.items():
+            setattr(setting, column, value)
+        version = _bump_settings_version(db)
+        db.commit()
+        # Update live settings object
+        _apply_setting(setting_name, setting.is_enabled, setting.value)
+        # Only adopt the new version if we were current before it; otherwise
+        # another process changed something too and the next refresh reloads all
+        if version == bot_settings.version + 1:
+            bot_settings.version = version
+        return True
+
+def update_setting(setting_name: str, is_enabled: bool):
+    return _save_setting(setting_name, is_enabled=is_enabled)
+
+def update_setting_value(setting_name: str, value: str):
+    return _save_setting(setting_name, value=value)
@@ -1,6 +1,6 @@
 # /bot/database/models.py
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, DateTime, Float
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Float, Index
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 import datetime
@@ -13,18 +13,37 @@ class User(Base):
     user_id = Column(Integer, unique=True, nullable=False)
     username = Column(String)
     is_subscribed = Column(Boolean, default=False)
-    subscription_expiry = Column(DateTime)
+    subscription_expiry = Column(DateTime) # is_subscribed is kept in sync by the expiry sweep
     strikes = Column(Integer, default=0)
     status = Column(String, default='active')  # active, paused, locked, banned
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+    # Activity counters, kept up to date by db.py in the same transaction as the task change
+    tasks_given = Column(Integer, default=0) # Tasks assigned to this user as a viewer
+    tasks_completed = Column(Integer, default=0)
+    tasks_rejected = Column(Integer, default=0)
+    tasks_pending_review = Column(Integer, default=0) # Proofs submitted, waiting for the owner
+    views_received = Column(Integer, default=0) # Completed views across all of the user's videos
+
     videos = relationship("Video", back_populates="owner")
     tasks_to_watch = relationship("Task", foreign_keys='Task.viewer_id', back_populates="viewer")
 
+    __table_args__ = (
+        # Keyset pagination for the admin user browser, one index per sort order
+        Index('ix_users_status_id', status, id),
+        Index('ix_users_strikes_id', strikes, id),
+        Index('ix_users_username_lower_id', func.lower(username), id),
+        # The same orders within one status, for a status filter combined with the above
+        Index('ix_users_status_strikes_id', status, strikes, id),
+        Index('ix_users_status_username_lower_id', status, func.lower(username), id),
+        # Expiry sweep: only users still flagged as subscribed, not everyone who ever lapsed
+        Index('ix_users_is_subscribed_expiry', is_subscribed, subscription_expiry),
+    )
+
 class Video(Base):
     __tablename__ = 'videos'
     id = Column(Integer, primary_key=True)
-    owner_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    owner_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
     title = Column(String, nullable=False)
     thumbnail_file_id = Column(String, nullable=False)
     link = Column(String)
@@ -52,6 +71,15 @@ class Task(Base):
     video = relationship("Video", back_populates="tasks")
     viewer = relationship("User", foreign_keys=[viewer_id], back_populates="tasks_to_watch")
 
+    __table_args__ = (
+        # Lets the expiry sweeper find stale 'assigned' tasks without a table scan
+        Index('ix_tasks_status_created_at', 'status', 'created_at'),
+        # A viewer's task history, used when assigning and when rebuilding counters
+        Index('ix_tasks_viewer_id_status', 'viewer_id', 'status'),
+        # An owner's review queue: their videos' tasks in 'proof_submitted'
+        Index('ix_tasks_video_id_status', 'video_id', 'status'),
+    )
+
 class AdminSettings(Base):
     __tablename__ = 'admin_settings'
     id = Column(Integer, primary_key=True)
@@ -59,3 +87,65 @@ class AdminSettings(Base):
     is_enabled = Column(Boolean, default=False)
     value = Column(String) # For storing things like subscription price
 
+
+class SettingsVersion(Base):
+    """Bumped in the same transaction as any admin_settings change so other processes notice it."""
+    __tablename__ = 'settings_version'
+    id = Column(Integer, primary_key=True) # Always a single row with id=1
+    version = Column(Integer, nullable=False, default=0)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    id = Column(Integer, primary_key=True) # Always a single row with id=1
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+class ProofFingerprint(Base):
+    """
+    One row per distinct proof file. Telegram's file_unique_id is stable
+    across chats and re-uploads, unlike file_id, so it identifies a reused proof.
+    """
+    __tablename__ = 'proof_fingerprints'
+    id = Column(Integer, primary_key=True)
+    file_unique_id = Column(String, unique=True, nullable=False)
+    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False, index=True)
+    viewer_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    file_size = Column(Integer)
+    duration = Column(Integer) # Seconds, videos only
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+# --- Stats Rollups ---
+# Maintained at write time by db.py so the admin stats panel never has to
+# scan users/videos/tasks. `/rebuild_stats` recomputes them from scratch.
+class StatCounter(Base):
+    __tablename__ = 'stat_counters'
+    name = Column(String, primary_key=True) # e.g. users_total, users_active, tasks_completed
+    value = Column(Integer, nullable=False, default=0)
+
+class DailyStat(Base):
+    __tablename__ = 'daily_stats'
+    day = Column(Date, primary_key=True)
+    completions = Column(Integer, nullable=False, default=0)
+    rejections = Column(Integer, nullable=False, default=0)
+
+# --- Event Log ---
+class Event(Base):
+    """
+    Append-only history of task and user state changes. Rows are written in
+    the same transaction as the change and never updated; the outbox reader
+    streams them out by id.
+    """
+    __tablename__ = 'events'
+    id = Column(Integer, primary_key=True) # Monotonic, doubles as the outbox cursor
+    event_type = Column(String, nullable=False) # assigned, proof_submitted, completed, invalid, expired, strike, ban, status_changed
+    task_id = Column(Integer)
+    user_id = Column(Integer) # The user the event is about (viewer for task events)
+    video_id = Column(Integer)
+    data = Column(String) # JSON with event-specific details
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class OutboxCursor(Base):
+    __tablename__ = 'outbox_cursors'
+    name = Column(String, primary_key=True) # One row per consumer
+    last_event_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
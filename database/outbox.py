@@ -0,0 +1,81 @@
+# /bot/database/outbox.py
+
+# Streams the append-only event log to JSONL files so reporting and fraud
+# review never have to touch the live tables. Progress is checkpointed per
+# consumer in outbox_cursors, after the file has been written and synced, so
+# a crash can at worst repeat a batch (at-least-once delivery).
+
+import datetime
+import json
+import os
+from sqlalchemy import select
+
+from .db import engine, get_db, _insert
+from .models import Event, OutboxCursor
+
+def get_cursor(name: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(OutboxCursor.last_event_id).where(OutboxCursor.name == name)).scalar() or 0
+
+def _save_cursor(name: str, last_event_id: int):
+    with get_db() as db:
+        statement = _insert(OutboxCursor).values(name=name, last_event_id=last_event_id, updated_at=datetime.datetime.utcnow())
+        db.execute(statement.on_conflict_do_update(
+            index_elements=['name'],
+            set_={'last_event_id': statement.excluded.last_event_id, 'updated_at': statement.excluded.updated_at}
+        ))
+        db.commit()
+
+def _event_line(row) -> str:
+    return json.dumps({
+        'id': row.id,
+        'type': row.event_type,
+        'task_id': row.task_id,
+        'user_id': row.user_id,
+        'video_id': row.video_id,
+        'data': json.loads(row.data) if row.data else None,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+    })
+
+def export_events(directory: str, batch_size: int = 1000, name: str = 'jsonl_export', max_batches: int = None) -> int:
+    """
+    Appends every event after the consumer's cursor to daily files
+    (`events-YYYY-MM-DD.jsonl`) in `directory`, one batch at a time,
+    checkpointing after each batch. Stops when caught up or after
+    `max_batches`. Returns the number of events exported.
+    """
+    os.makedirs(directory, exist_ok=True)
+    cursor = get_cursor(name)
+    exported = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(Event.id, Event.event_type, Event.task_id, Event.user_id, Event.video_id, Event.data, Event.created_at)
+                .where(Event.id > cursor)
+                .order_by(Event.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            break
+
+        lines_by_day = {}
+        for row in rows:
+            day = (row.created_at or datetime.datetime.utcnow()).date().isoformat()
+            lines_by_day.setdefault(day, []).append(_event_line(row))
+
+        for day, lines in lines_by_day.items():
+            with open(os.path.join(directory, f"events-{day}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+        cursor = rows[-1].id
+        _save_cursor(name, cursor)
+        exported += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+
+    return exported
@@ -0,0 +1,73 @@
+# /bot/database/records.py
+
+# Compact, read-only rows returned by the hot read paths in db.py.
+# They are plain named tuples: no identity map, no attribute instrumentation,
+# and they stay usable after the session that produced them is closed.
+# Writes still go through the ORM models in models.py.
+
+import datetime
+from typing import NamedTuple, Optional
+
+class UserRecord(NamedTuple):
+    user_id: int
+    username: Optional[str]
+    status: str
+    strikes: int
+    is_subscribed: bool
+    subscription_expiry: Optional[datetime.datetime]
+    tasks_given: int
+    tasks_completed: int
+    tasks_rejected: int
+    tasks_pending_review: int
+    views_received: int
+
+class UserListRecord(NamedTuple):
+    """One row of the admin user browser."""
+    id: int
+    user_id: int
+    username: Optional[str]
+    status: str
+    strikes: int
+
+class VideoRecord(NamedTuple):
+    id: int
+    title: str
+    is_active: bool
+    views_received: int
+
+class TaskRecord(NamedTuple):
+    id: int
+    video_id: int
+    viewer_id: int
+    status: str
+    proof_file_id: Optional[str]
+    proof_type: Optional[str]
+    owner_id: int # Owner of the video being watched
+    video_title: str
+
+class AssignedTask(NamedTuple):
+    """A freshly assigned task together with everything needed to show it to the viewer."""
+    id: int
+    video_id: int
+    title: str
+    length_minutes: int
+    process_instructions: str
+    link: Optional[str]
+    thumbnail_file_id: str
+
+class ProofFingerprintRecord(NamedTuple):
+    task_id: int
+    viewer_id: int
+    file_size: Optional[int]
+    duration: Optional[int]
+
+class DuplicateProof(NamedTuple):
+    """update_task_with_proof's answer when the file was already used for another task."""
+    task_id: int
+    first_task_id: int
+
+class UnfingerprintedProof(NamedTuple):
+    """A task whose proof was stored before fingerprints existed."""
+    task_id: int
+    viewer_id: int
+    proof_file_id: str
@@ -1,12 +1,17 @@
 # /bot/handlers/admin.py
 
+import logging
 from functools import wraps
 from telegram import Update, ReplyKeyboardRemove
-from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, ConversationHandler, MessageHandler, filters
 
-from ..config import ADMIN_IDS, bot_settings
+from ..config import ADMIN_IDS, bot_settings, SUBSCRIPTION_PERIOD_DAYS, FINGERPRINT_BACKFILL_INTERVAL_SECONDS
 from ..database import db
 from ..keyboards import reply
+from .. import lifecycle
+from . import jobs
+
+logger = logging.getLogger(__name__)
 
 # --- Decorator for Admin-only commands ---
 def admin_only(func):
@@ -31,9 +36,9 @@ async def exit_admin_panel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # --- Settings ---
 @admin_only
 async def show_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    db.load_settings() # Ensure live settings are loaded from DB
+    db.refresh_settings(force=True) # Reloads only if another process changed something
     await update.message.reply_text(
-        "⚙️ Bot Settings",
+        f"⚙️ Bot Settings\n\nSubscription price: ₹{bot_settings.subscription_price} (change with /set_price <amount>)",
         reply_markup=reply.admin_settings_keyboard(
             bot_settings.subscription_mode,
             bot_settings.ai_moderation_mode
@@ -49,6 +54,8 @@ async def toggle_settings_callback(update: Update, context: ContextTypes.DEFAULT
         await query.answer("❌ Unauthorized!", show_alert=True)
         return
         
+    # Toggle from the current shared value, not a possibly stale local copy
+    db.refresh_settings(force=True)
     setting_to_toggle = query.data.replace("toggle_", "")
     
     if setting_to_toggle == "sub_mode":
@@ -61,7 +68,6 @@ async def toggle_settings_callback(update: Update, context: ContextTypes.DEFAULT
         await query.message.reply_text(f"AI Moderation has been {'ENABLED' if new_status else 'DISABLED'}.")
 
     # Refresh the settings keyboard
-    db.load_settings()
     await query.edit_message_reply_markup(
         reply_markup=reply.admin_settings_keyboard(
             bot_settings.subscription_mode,
@@ -69,6 +75,208 @@ async def toggle_settings_callback(update: Update, context: ContextTypes.DEFAULT
         )
     )
 
+# --- Stats ---
+def _format_stats(counters: dict, daily: list) -> str:
+    get = lambda name: counters.get(name, 0)
+    reviewed = get('tasks_completed') + get('tasks_invalid_proof')
+    rejection_rate = get('tasks_invalid_proof') / reviewed * 100 if reviewed else 0
+
+    text = (
+        "📊 *Bot Stats*\n\n"
+        f"*Users:* {get('users_total')}\n"
+        f"   - Active: {get('users_active')}\n"
+        f"   - Paused: {get('users_paused')}\n"
+        f"   - Locked: {get('users_locked')}\n"
+        f"   - Banned: {get('users_banned')}\n\n"
+        f"*Videos:* {get('videos_total')} ({get('videos_active')} active)\n\n"
+        f"*Tasks:*\n"
+        f"   - Assigned: {get('tasks_assigned')}\n"
+        f"   - Awaiting review: {get('tasks_proof_submitted')}\n"
+        f"   - Completed: {get('tasks_completed')}\n"
+        f"   - Rejected: {get('tasks_invalid_proof')}\n"
+        f"   - Expired: {get('tasks_expired')}\n"
+        f"   - Rejection rate: {rejection_rate:.1f}%\n\n"
+        f"*Strikes issued:* {get('strikes_total')}\n"
+    )
+    if daily:
+        text += f"\n*Last {db.STATS_HISTORY_DAYS} days* (✅ completed / ❌ rejected):\n"
+        for day, completions, rejections in daily:
+            text += f"   {day.isoformat()}: ✅ {completions} / ❌ {rejections}\n"
+    return text
+
+@admin_only
+async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    counters, daily = db.get_stats()
+    await update.message.reply_text(_format_stats(counters, daily), parse_mode='Markdown')
+
+@admin_only
+async def rebuild_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_text("⏳ Rebuilding stats from scratch...")
+    db.rebuild_stats()
+    counters, daily = db.get_stats()
+    await update.message.reply_text("✅ Stats rebuilt.\n\n" + _format_stats(counters, daily), parse_mode='Markdown')
+
+# --- User Browser ---
+# Filter state and page cursors live in user_data so callback_data stays
+# well under Telegram's 64-byte limit.
+def _browser_query(filter_name: str, prefix: str = None) -> dict:
+    return {
+        'filter': filter_name,
+        'status': filter_name if filter_name not in ('all', 'strikes') else None,
+        'min_strikes': 1 if filter_name == 'strikes' else None,
+        'prefix': prefix,
+    }
+
+def _load_users_page(browser: dict, direction: str = None):
+    after = before = None
+    if direction == 'next':
+        after = browser['last']
+    elif direction == 'prev':
+        before = browser['first']
+
+    rows, has_more = db.get_users_page(
+        status=browser['status'],
+        min_strikes=browser['min_strikes'],
+        username_prefix=browser['prefix'],
+        after=after,
+        before=before
+    )
+    if direction == 'prev':
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = direction == 'next', has_more
+
+    if rows:
+        browser['first'] = rows[0][1]
+        browser['last'] = rows[-1][1]
+    return [record for record, _ in rows], has_prev, has_next
+
+def _format_users_page(browser: dict, users: list) -> str:
+    title = "👥 Users"
+    if browser['prefix']:
+        title += f" matching '{browser['prefix']}'"
+    if not users:
+        return f"{title}\n\nNo users found."
+
+    lines = [title, ""]
+    for user in users:
+        name = f"@{user.username}" if user.username else "(no username)"
+        lines.append(f"{name} | ID {user.user_id} | {user.status} | strikes {user.strikes}")
+    return "\n".join(lines)
+
+async def _send_users_page(update: Update, context: ContextTypes.DEFAULT_TYPE, browser: dict):
+    context.user_data['user_browser'] = browser
+    users, has_prev, has_next = _load_users_page(browser)
+    await update.message.reply_text(
+        _format_users_page(browser, users),
+        reply_markup=reply.user_browser_keyboard(browser['filter'], has_prev, has_next)
+    )
+
+@admin_only
+async def view_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await _send_users_page(update, context, _browser_query('all'))
+
+@admin_only
+async def search_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await update.message.reply_text("Usage: /users <username prefix>")
+        return
+    await _send_users_page(update, context, _browser_query('all', prefix=context.args[0]))
+
+async def user_browser_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    if query.from_user.id not in ADMIN_IDS:
+        await query.answer("❌ Unauthorized!", show_alert=True)
+        return
+
+    _, kind, value = query.data.split('_', 2)
+    browser = context.user_data.get('user_browser')
+    if kind == 'filter' or not browser:
+        # A new filter restarts from the first page but keeps any search prefix
+        prefix = browser['prefix'] if browser else None
+        browser = _browser_query(value if kind == 'filter' else 'all', prefix=prefix)
+        direction = None
+    else:
+        direction = value
+
+    context.user_data['user_browser'] = browser
+    users, has_prev, has_next = _load_users_page(browser, direction)
+    if not users and direction:
+        await query.answer("No more users.")
+        return
+    await query.answer()
+    await query.edit_message_text(
+        _format_users_page(browser, users),
+        reply_markup=reply.user_browser_keyboard(browser['filter'], has_prev, has_next)
+    )
+
+# --- Proof Fingerprints ---
+@admin_only
+async def backfill_fingerprints(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if context.job_queue.get_jobs_by_name("fingerprint_backfill"):
+        await update.message.reply_text("A fingerprint backfill is already running.")
+        return
+    context.job_queue.run_repeating(
+        jobs.backfill_proof_fingerprints_job,
+        interval=FINGERPRINT_BACKFILL_INTERVAL_SECONDS,
+        first=0,
+        data={'admin_id': update.effective_user.id, 'after_task_id': 0, 'added': 0, 'duplicates': 0, 'failed': 0},
+        name="fingerprint_backfill"
+    )
+    await update.message.reply_text("⏳ Started fingerprinting existing proofs. You'll get a message when it's done.")
+
+# --- Subscriptions ---
+def _parse_subscription_args(args):
+    """Parses '<user_id> [days]' command arguments. Returns (user_id, days) or None."""
+    try:
+        user_id = int(args[0])
+        days = int(args[1]) if len(args) > 1 else SUBSCRIPTION_PERIOD_DAYS
+    except (IndexError, ValueError):
+        return None
+    if days <= 0:
+        return None
+    return user_id, days
+
+async def _change_subscription(update: Update, context: ContextTypes.DEFAULT_TYPE, apply, verb: str):
+    parsed = _parse_subscription_args(context.args)
+    if not parsed:
+        await update.message.reply_text(f"Usage: /{verb} <user_id> [days]\nDays defaults to {SUBSCRIPTION_PERIOD_DAYS}.")
+        return
+    user_id, days = parsed
+
+    expiry = apply(user_id, days)
+    if not expiry:
+        await update.message.reply_text(f"❌ No user found with ID {user_id}.")
+        return
+
+    expiry_text = expiry.strftime('%Y-%m-%d %H:%M UTC')
+    await update.message.reply_text(f"✅ Subscription for {user_id} is now active until {expiry_text}.")
+    try:
+        await context.bot.send_message(chat_id=user_id, text=f"🎉 Your subscription is active until {expiry_text}.")
+    except Exception as e:
+        logger.warning(f"Failed to notify {user_id} about subscription: {e}")
+
+@admin_only
+async def grant_subscription(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await _change_subscription(update, context, db.grant_subscription, "grant")
+
+@admin_only
+async def extend_subscription(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await _change_subscription(update, context, db.extend_subscription, "extend")
+
+@admin_only
+async def set_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    try:
+        price = int(context.args[0])
+    except (IndexError, ValueError):
+        await update.message.reply_text("Usage: /set_price <amount in INR>")
+        return
+    if price <= 0:
+        await update.message.reply_text("❌ The price must be a positive number.")
+        return
+    db.update_setting_value('subscription_price', str(price))
+    await update.message.reply_text(f"✅ Subscription price set to ₹{price}.")
+
 # --- Broadcast ---
 BROADCAST_MESSAGE = range(1)
 @admin_only
@@ -86,7 +294,13 @@ async def broadcast_send(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await update.message.reply_text(f"Starting broadcast to {len(all_users)} users...")
     
-    for user in all_users:
+    for index, user in enumerate(all_users):
+        if lifecycle.is_draining():
+            # Shutting down: stop here rather than be cut off mid-loop
+            remaining = len(all_users) - index
+            lifecycle.state.record_dropped('broadcast_messages', remaining)
+            await update.message.reply_text(f"⚠️ Broadcast stopped by a bot restart.\n\nSent: {sent_count}\nFailed: {failed_count}\nNot sent: {remaining}")
+            return -1
         try:
             await context.bot.send_message(chat_id=user.user_id, text=message_to_send)
             sent_count += 1
@@ -105,21 +319,20 @@ async def broadcast_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Admin Handlers
 admin_handlers = [
     CommandHandler("admin", admin_panel),
-    MessageHandler(filters.Regex('^↩️ Exit Admin$'), exit_admin_panel),
-    MessageHandler(filters.Regex('^⚙️ Settings$'), show_settings),
     CallbackQueryHandler(toggle_settings_callback, pattern=r'^toggle_(sub|ai)_mode$'),
-    # Add other admin command handlers here (e.g., view users, stats)
+    CommandHandler("grant", grant_subscription),
+    CommandHandler("extend", extend_subscription),
+    CommandHandler("rebuild_stats", rebuild_stats),
+    CommandHandler("set_price", set_price),
+    CommandHandler("users", search_users),
+    CommandHandler("backfill_fingerprints", backfill_fingerprints),
+    CallbackQueryHandler(user_browser_callback, pattern=r'^users_(filter|page)_'),
 ]
 
 broadcast_handler = ConversationHandler(
-    entry_points=[MessageHandler(filters.Regex('^📢 Broadcast Message$'), broadcast_start)],
+    entry_points=[MessageHandler(filters.Text([reply.ADMIN_BROADCAST]), broadcast_start)],
     states={
         BROADCAST_MESSAGE: [MessageHandler(filters.TEXT & ~filters.COMMAND, broadcast_send)],
     },
     fallbacks=[CommandHandler('cancel', broadcast_cancel)],
 )
-
-# You can add more handlers for viewing stats, users, managing strikes etc.
-# For example:
-# @admin_only
-# async def view_users(update: Update, context: ContextTypes.DEFAULT_TYPE): ...
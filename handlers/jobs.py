@@ -0,0 +1,93 @@
+# /bot/handlers/jobs.py
+
+import datetime
+import logging
+from telegram.ext import ContextTypes
+
+from ..database import db, outbox
+from ..config import (
+    TASK_ASSIGNMENT_TIMEOUT_MINUTES, TASK_EXPIRY_BATCH_SIZE, FINGERPRINT_BACKFILL_BATCH_SIZE,
+    EVENT_EXPORT_DIR, EVENT_EXPORT_BATCH_SIZE
+)
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- TASK EXPIRY SWEEP ---
+async def expire_stale_tasks_job(context: ContextTypes.DEFAULT_TYPE):
+    """Expires tasks that were handed out but never proven within the timeout."""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(minutes=TASK_ASSIGNMENT_TIMEOUT_MINUTES)
+    expired = db.expire_stale_tasks(cutoff, TASK_EXPIRY_BATCH_SIZE)
+
+    # Forget the task in the viewer's session so a late proof isn't attached to it
+    for task_id, viewer_id in expired:
+        user_data = context.application.user_data.get(viewer_id)
+        if user_data and user_data.get('current_task_id') == task_id:
+            user_data.pop('current_task_id', None)
+
+    metrics.increment('tasks_expired_total', len(expired))
+    metrics.set_gauge('tasks_expired_last_sweep', len(expired))
+    if expired:
+        logger.info(f"Expired {len(expired)} stale tasks older than {cutoff.isoformat()}")
+
+# --- SUBSCRIPTION EXPIRY SWEEP ---
+async def expire_subscriptions_job(context: ContextTypes.DEFAULT_TYPE):
+    """Turns off the is_subscribed flag for users whose subscription has run out."""
+    flipped = db.expire_subscriptions()
+    metrics.increment('subscriptions_expired_total', flipped)
+    if flipped:
+        logger.info(f"Expired {flipped} subscriptions")
+
+# --- PROOF FINGERPRINT BACKFILL ---
+async def backfill_proof_fingerprints_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Fingerprints proofs stored before file_unique_id was recorded, one batch
+    per run. The keyset cursor lives in job.data, so each run starts where
+    the last one stopped. The job removes itself once nothing is left.
+    """
+    job = context.job
+    proofs = db.get_unfingerprinted_proofs(job.data['after_task_id'], FINGERPRINT_BACKFILL_BATCH_SIZE)
+    if not proofs:
+        job.schedule_removal()
+        logger.info(f"Fingerprint backfill finished: {job.data['added']} added, {job.data['duplicates']} duplicates, {job.data['failed']} failed")
+        await context.bot.send_message(
+            chat_id=job.data['admin_id'],
+            text=(
+                "✅ Proof fingerprint backfill finished.\n\n"
+                f"Added: {job.data['added']}\n"
+                f"Reused proofs found: {job.data['duplicates']}\n"
+                f"Unavailable files: {job.data['failed']}"
+            )
+        )
+        return
+
+    rows = []
+    for proof in proofs:
+        try:
+            telegram_file = await context.bot.get_file(proof.proof_file_id)
+        except Exception as e:
+            # Files over the Bot API download limit or no longer available
+            job.data['failed'] += 1
+            logger.warning(f"Could not fetch proof for task {proof.task_id}: {e}")
+            continue
+        rows.append({
+            'file_unique_id': telegram_file.file_unique_id,
+            'task_id': proof.task_id,
+            'viewer_id': proof.viewer_id,
+            'file_size': telegram_file.file_size,
+            'duration': None,
+        })
+
+    added = db.add_proof_fingerprints(rows)
+    job.data['after_task_id'] = proofs[-1].task_id
+    job.data['added'] += added
+    job.data['duplicates'] += len(rows) - added
+    metrics.increment('proof_fingerprints_backfilled_total', added)
+
+# --- EVENT LOG EXPORT ---
+async def export_events_job(context: ContextTypes.DEFAULT_TYPE):
+    """Ships new event log rows to the JSONL outbox."""
+    exported = outbox.export_events(EVENT_EXPORT_DIR, EVENT_EXPORT_BATCH_SIZE)
+    metrics.increment('events_exported_total', exported)
+    if exported:
+        logger.info(f"Exported {exported} events to {EVENT_EXPORT_DIR}")
@@ -5,7 +5,6 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from ..database import db
 from ..config import bot_settings
-import datetime
 
 def check_user_status(func):
     """
@@ -13,6 +12,8 @@ def check_user_status(func):
     """
     @wraps(func)
     async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        # Cheap: at most one tiny version read every few seconds
+        db.refresh_settings()
         user = db.get_user(update.effective_user.id)
         
         if not user:
@@ -25,11 +26,12 @@ def check_user_status(func):
             return
             
         # 2. Check for subscription if enabled by admin
+        # is_subscribed is flipped off by the subscription sweep job, so no date math here
         if bot_settings.subscription_mode:
-            is_subscribed = user.is_subscribed and user.subscription_expiry > datetime.datetime.utcnow()
-            if not is_subscribed:
+            if not user.is_subscribed:
                 await update.message.reply_text(
                     "🔒 This bot is currently in subscription mode. Your subscription is inactive.\n\n"
+                    f"The subscription costs ₹{bot_settings.subscription_price}. "
                     "Please contact an admin to subscribe and unlock the features."
                 )
                 return
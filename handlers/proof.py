@@ -1,12 +1,18 @@
 # /bot/handlers/proof.py
 
-from telegram import Update
+import datetime
+import logging
+from telegram import Update, InputMediaPhoto, InputMediaVideo
 from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters, CallbackQueryHandler
 from ..database import db
+from ..database.records import DuplicateProof
 from ..keyboards import reply
-from ..config import PROOF_REVIEW_TIMEOUT_MINUTES, MAX_STRIKES
+from ..config import PROOF_REVIEW_TIMEOUT_MINUTES, MAX_STRIKES, REVIEW_QUEUE_PAGE_SIZE, REVIEW_PAGES_KEPT
+from ..utils import metrics
 from .middleware import check_user_status
 
+logger = logging.getLogger(__name__)
+
 # --- TASK ASSIGNMENT ---
 @check_user_status
 async def get_next_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -24,27 +30,31 @@ async def get_next_task(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     context.user_data['current_task_id'] = task.id
-    video = task.video
     
     caption = (
         f"🔥 *New Task!* 🔥\n\n"
-        f"*Title:* {video.title}\n"
-        f"*Length:* {video.length_minutes} minutes\n\n"
-        f"*Instructions from owner:*\n`{video.process_instructions}`\n\n"
+        f"*Title:* {task.title}\n"
+        f"*Length:* {task.length_minutes} minutes\n\n"
+        f"*Instructions from owner:*\n`{task.process_instructions}`\n\n"
     )
-    if video.link and 'http' in video.link:
-         caption += f"[Watch Video]({video.link})\n\n"
+    if task.link and 'http' in task.link:
+         caption += f"[Watch Video]({task.link})\n\n"
     
     caption += "After you finish, please upload a *screen recording or video* as proof."
     
     await context.bot.send_photo(
         chat_id=user_id,
-        photo=video.thumbnail_file_id,
+        photo=task.thumbnail_file_id,
         caption=caption,
         parse_mode='Markdown'
     )
 
 # --- PROOF SUBMISSION ---
+async def _reject_duplicate_proof(update: Update, task_id: int, first_task_id: int):
+    metrics.increment('duplicate_proofs_rejected_total')
+    logger.info(f"Duplicate proof from {update.effective_user.id} for task {task_id}, first used for task {first_task_id}")
+    await update.message.reply_text("❌ This proof has already been submitted for another task. Please record a new proof for this video.")
+
 @check_user_status
 async def handle_proof(update: Update, context: ContextTypes.DEFAULT_TYPE):
     task_id = context.user_data.get('current_task_id')
@@ -52,43 +62,60 @@ async def handle_proof(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("🤔 It seems you don't have an active task. Please get a task first.")
         return
     
-    proof_file_id = None
-    proof_type = None
+    duration = None
     if update.message.video:
-        proof_file_id = update.message.video.file_id
+        proof_file = update.message.video
         proof_type = 'video'
+        duration = proof_file.duration
     elif update.message.photo:
         # Allow photo as proof too, though video is preferred
-        proof_file_id = update.message.photo[-1].file_id
+        proof_file = update.message.photo[-1]
         proof_type = 'photo'
     else:
         await update.message.reply_text("❌ Invalid proof format. Please send a screen recording (video) or a screenshot (photo).")
         return
-        
-    task = db.update_task_with_proof(task_id, proof_file_id, proof_type)
+    proof_file_id = proof_file.file_id
+
+    # file_unique_id is the same for every re-upload of the same file, so this
+    # catches one recording being reused across tasks before the owner sees it
+    previous = db.find_proof_fingerprint(proof_file.file_unique_id)
+    if previous and previous.task_id != task_id:
+        await _reject_duplicate_proof(update, task_id, previous.task_id)
+        return
+
+    task = db.update_task_with_proof(
+        task_id, proof_file_id, proof_type,
+        file_unique_id=proof_file.file_unique_id,
+        file_size=proof_file.file_size,
+        duration=duration
+    )
+
+    # The same file can be submitted for two tasks at once; the write settles it
+    if isinstance(task, DuplicateProof):
+        await _reject_duplicate_proof(update, task_id, task.first_task_id)
+        return
     
     if not task:
-        await update.message.reply_text("An error occurred. Could not find the task.")
+        await update.message.reply_text("An error occurred. Could not find the task, or it has expired. Please get a new task.")
+        context.user_data.pop('current_task_id', None)
         return
     
     await update.message.reply_text("✅ Proof submitted! The video owner will now review it. Please be patient.")
     
     # Notify the video owner
-    owner_id = task.video.owner_id
+    owner_id = task.owner_id
     try:
-        await context.bot.send_message(
-            chat_id=owner_id,
-            text=(
-                "🔔 *New Proof Submitted for Your Video!* \n\n"
-                f"A user has submitted proof for your video: *'{task.video.title}'*. \n\n"
-                f"Please review it within *{PROOF_REVIEW_TIMEOUT_MINUTES} minutes* or the task will be auto-approved and the user might report you."
-            ),
-            parse_mode='Markdown'
+        # One message per proof: the alert rides along as the media caption
+        caption = (
+            "🔔 *New Proof Submitted for Your Video!* \n\n"
+            f"A user has submitted proof for your video: *'{task.video_title}'*. \n\n"
+            f"Please review it within *{PROOF_REVIEW_TIMEOUT_MINUTES} minutes* or the task will be auto-approved and the user might report you.\n\n"
+            f"Got several waiting? Press '{reply.REVIEW_QUEUE}' to review them together."
         )
         if proof_type == 'video':
-            await context.bot.send_video(chat_id=owner_id, video=proof_file_id, caption="Review this proof:", reply_markup=reply.proof_review_keyboard(task.id))
+            await context.bot.send_video(chat_id=owner_id, video=proof_file_id, caption=caption, parse_mode='Markdown', reply_markup=reply.proof_review_keyboard(task.id))
         else:
-            await context.bot.send_photo(chat_id=owner_id, photo=proof_file_id, caption="Review this proof:", reply_markup=reply.proof_review_keyboard(task.id))
+            await context.bot.send_photo(chat_id=owner_id, photo=proof_file_id, caption=caption, parse_mode='Markdown', reply_markup=reply.proof_review_keyboard(task.id))
         
         # Schedule a job to auto-approve if no action is taken
         context.job_queue.run_once(
@@ -118,7 +145,7 @@ async def proof_review_callback(update: Update, context: ContextTypes.DEFAULT_TY
     
     task = db.get_task_by_id(task_id)
 
-    if not task or task.video.owner_id != query.from_user.id:
+    if not task or task.owner_id != query.from_user.id:
         await query.edit_message_text("❌ This is not your task to review or it has expired.")
         return
         
@@ -135,7 +162,7 @@ async def proof_review_callback(update: Update, context: ContextTypes.DEFAULT_TY
     if action == "valid":
         db.complete_task(task_id)
         await query.edit_message_text("✅ Proof accepted! Both you and the viewer have been credited.")
-        await context.bot.send_message(chat_id=viewer_id, text=f"🎉 Good news! Your proof for the video *'{task.video.title}'* has been accepted.", parse_mode='Markdown')
+        await context.bot.send_message(chat_id=viewer_id, text=f"🎉 Good news! Your proof for the video *'{task.video_title}'* has been accepted.", parse_mode='Markdown')
 
     elif action == "invalid":
         context.user_data[f'invalid_task_{query.from_user.id}'] = task_id
@@ -162,18 +189,148 @@ async def handle_rejection_reason(update: Update, context: ContextTypes.DEFAULT_
         await context.bot.send_message(
             chat_id=task.viewer_id,
             text=(
-                f"❌ Your proof for *'{task.video.title}'* was rejected.\n\n"
+                f"❌ Your proof for *'{task.video_title}'* was rejected.\n\n"
                 f"*Reason:* {reason}\n\n"
                 f"You have received a strike. You now have {strikes}/{MAX_STRIKES} strikes. "
                 "Please be honest in your future tasks. If you believe this is a mistake, contact an admin."
             ),
             parse_mode='Markdown'
         )
+    else:
+        await update.message.reply_text("This proof was already reviewed in the meantime, so nothing was changed.")
     
     context.user_data.pop(f'invalid_task_{user_id}', None)
 
 
+# --- REVIEW QUEUE ---
+def _cancel_proof_timeout(context: ContextTypes.DEFAULT_TYPE, task_id: int):
+    for job in context.job_queue.get_jobs_by_name(f"proof_timeout_{task_id}"):
+        job.schedule_removal()
+
+async def _send_review_page(context: ContextTypes.DEFAULT_TYPE, owner_id: int, after_id: int = None):
+    # Ask for one extra row to know whether there is a next page
+    tasks = db.get_pending_proofs_for_owner(owner_id, after_id=after_id, limit=REVIEW_QUEUE_PAGE_SIZE + 1)
+    has_next = len(tasks) > REVIEW_QUEUE_PAGE_SIZE
+    tasks = tasks[:REVIEW_QUEUE_PAGE_SIZE]
+
+    if not tasks:
+        await context.bot.send_message(chat_id=owner_id, text="📭 No proofs are waiting for your review.")
+        return
+
+    media = []
+    for number, task in enumerate(tasks, 1):
+        caption = f"#{number} – {task.video_title}"
+        if task.proof_type == 'video':
+            media.append(InputMediaVideo(task.proof_file_id, caption=caption))
+        else:
+            media.append(InputMediaPhoto(task.proof_file_id, caption=caption))
+
+    # Albums need at least two items
+    if len(media) == 1:
+        if tasks[0].proof_type == 'video':
+            await context.bot.send_video(chat_id=owner_id, video=tasks[0].proof_file_id, caption=media[0].caption)
+        else:
+            await context.bot.send_photo(chat_id=owner_id, photo=tasks[0].proof_file_id, caption=media[0].caption)
+    else:
+        await context.bot.send_media_group(chat_id=owner_id, media=media)
+
+    digest = "📥 *Review Queue*\n\n" + "\n".join(f"#{number} – {task.video_title}" for number, task in enumerate(tasks, 1))
+    digest += "\n\nReject any bad proofs by number, then approve the rest in one go."
+    message = await context.bot.send_message(
+        chat_id=owner_id,
+        text=digest,
+        parse_mode='Markdown',
+        reply_markup=reply.review_queue_keyboard([task.id for task in tasks], has_next)
+    )
+    # Pages are saved per digest message, so buttons on an older digest act on the proofs it lists
+    pages = context.user_data.setdefault('review_pages', {})
+    pages[message.message_id] = [task.id for task in tasks]
+    while len(pages) > REVIEW_PAGES_KEPT:
+        pages.pop(next(iter(pages)))
+
+@check_user_status
+async def show_review_queue(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await _send_review_page(context, update.effective_user.id)
+
+async def review_queue_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    owner_id = query.from_user.id
+    pages = context.user_data.get('review_pages', {})
+    page = pages.get(query.message.message_id) if query.message else None
+
+    if query.data in ("review_next", "review_approve_all") and page is None:
+        await query.answer("This page has expired. Send /reviews to get a fresh one.", show_alert=True)
+        return
+
+    if query.data == "review_next":
+        await query.answer()
+        await _send_review_page(context, owner_id, after_id=max(page) if page else None)
+
+    elif query.data == "review_approve_all":
+        # A proof whose rejection reason is still being typed isn't approved
+        rejecting = context.user_data.get(f'invalid_task_{owner_id}')
+        approved, statements = db.complete_tasks([task_id for task_id in page if task_id != rejecting], owner_id)
+        if not approved:
+            await query.answer("Nothing left to approve on this page.", show_alert=True)
+            return
+        await query.answer()
+        pages.pop(query.message.message_id, None)
+
+        per_proof = statements / len(approved)
+        metrics.increment('proofs_bulk_approved_total', len(approved))
+        metrics.set_gauge('bulk_approve_statements_per_proof', per_proof)
+
+        for task in approved:
+            _cancel_proof_timeout(context, task.id)
+        await query.edit_message_text(
+            f"✅ Approved {len(approved)} proofs in one transaction "
+            f"({statements} SQL statements, {per_proof:.2f} per proof)."
+        )
+        for task in approved:
+            try:
+                await context.bot.send_message(chat_id=task.viewer_id, text=f"🎉 Good news! Your proof for the video *'{task.video_title}'* has been accepted.", parse_mode='Markdown')
+            except Exception as e:
+                logger.warning(f"Failed to notify viewer {task.viewer_id}: {e}")
+
+    elif query.data.startswith("review_reject_"):
+        task_id = int(query.data.rsplit('_', 1)[1])
+        task = db.get_task_by_id(task_id)
+        if not task or task.owner_id != owner_id or task.status != 'proof_submitted':
+            await query.answer("This proof has already been reviewed.", show_alert=True)
+            return
+        await query.answer()
+        _cancel_proof_timeout(context, task_id)
+        context.user_data[f'invalid_task_{owner_id}'] = task_id
+        for saved in pages.values():
+            if task_id in saved:
+                saved.remove(task_id)
+        # A new message keeps the digest and its Approve all button usable
+        await context.bot.send_message(
+            chat_id=owner_id,
+            text=f"Okay, rejecting the proof for *'{task.video_title}'*. Please now send a brief reason why.",
+            parse_mode='Markdown'
+        )
+
 # --- TIMEOUT JOB ---
+def reschedule_proof_timeouts(job_queue):
+    """
+    Recreates the auto-approve timeout for every proof still awaiting review.
+    The tasks table is the checkpoint: jobs are in memory only and are lost
+    whenever the bot restarts. Overdue proofs get their timeout right away,
+    without the owner strike: their time ran out while the bot was down.
+    """
+    now = datetime.datetime.utcnow()
+    pending = db.get_pending_proof_timeouts()
+    for task_id, viewer_id, submitted_at in pending:
+        due = submitted_at + datetime.timedelta(minutes=PROOF_REVIEW_TIMEOUT_MINUTES)
+        job_queue.run_once(
+            auto_validate_proof,
+            when=max((due - now).total_seconds(), 0),
+            data={'task_id': task_id, 'viewer_id': viewer_id, 'strike': due > now},
+            name=f"proof_timeout_{task_id}"
+        )
+    return len(pending)
+
 async def auto_validate_proof(context: ContextTypes.DEFAULT_TYPE):
     job_data = context.job.data
     task_id = job_data['task_id']
@@ -182,28 +339,32 @@ async def auto_validate_proof(context: ContextTypes.DEFAULT_TYPE):
     # Check if task is still pending, if so, auto-approve
     if task and task.status == 'proof_submitted':
         db.complete_task(task_id)
-        owner_id = task.video.owner_id
+        owner_id = task.owner_id
         viewer_id = task.viewer_id
         
-        # Add a strike to the owner for not responding
-        db.add_strike(owner_id)
+        # Add a strike to the owner for not responding, unless the bot was down when time ran out
+        strike = job_data.get('strike', True)
+        if strike:
+            db.add_strike(owner_id)
 
         # Notify both parties
         await context.bot.send_message(
             chat_id=viewer_id,
-            text=f"Your proof for *'{task.video.title}'* has been automatically approved because the owner did not respond in time.",
-            parse_mode='Markdown'
-        )
-        await context.bot.send_message(
-            chat_id=owner_id,
-            text=f"You failed to review a proof for your video *'{task.video.title}'* in time. It has been auto-approved and you have received 1 strike for being unresponsive.",
+            text=f"Your proof for *'{task.video_title}'* has been automatically approved because the owner did not respond in time.",
             parse_mode='Markdown'
         )
+        if strike:
+            owner_text = f"You failed to review a proof for your video *'{task.video_title}'* in time. It has been auto-approved and you have received 1 strike for being unresponsive."
+        else:
+            owner_text = f"A proof for your video *'{task.video_title}'* was auto-approved because its review time ran out while the bot was unavailable. No strike was given."
+        await context.bot.send_message(chat_id=owner_id, text=owner_text, parse_mode='Markdown')
 
 # Handlers
 proof_handlers = [
-    MessageHandler(filters.Regex('^▶️ Get Next Task$'), get_next_task),
     MessageHandler(filters.VIDEO | filters.PHOTO & ~filters.COMMAND, handle_proof),
     CallbackQueryHandler(proof_review_callback, pattern=r'^proof_(valid|invalid)_.+'),
+    CommandHandler("reviews", show_review_queue),
+    CallbackQueryHandler(review_queue_callback, pattern=r'^review_(next|approve_all|reject_\d+)$'),
+    # Catch-all for free text, must stay registered after every other text handler
     MessageHandler(filters.TEXT & ~filters.COMMAND, handle_rejection_reason),
 ]
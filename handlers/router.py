@@ -0,0 +1,61 @@
+# /bot/handlers/router.py
+
+# Routes reply-keyboard button presses with one dictionary lookup instead of
+# a chain of regex MessageHandlers. Only texts that are exact button labels
+# reach the router; everything else falls through to the conversation and
+# state handlers registered after it.
+
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes, MessageHandler, filters
+
+from ..keyboards import reply
+from . import user, admin, proof
+
+logger = logging.getLogger(__name__)
+
+# Button label -> callback
+ROUTES = {
+    reply.MY_VIDEOS: user.get_my_videos,
+    reply.MY_STATS: user.get_my_stats,
+    reply.PAUSE_TASKS: user.toggle_pause_tasks,
+    reply.RESUME_TASKS: user.toggle_pause_tasks,
+    reply.GET_NEXT_TASK: proof.get_next_task,
+    reply.REVIEW_QUEUE: proof.show_review_queue,
+    reply.ADMIN_STATS: admin.show_stats,
+    reply.ADMIN_VIEW_USERS: admin.view_users,
+    reply.ADMIN_SETTINGS: admin.show_settings,
+    reply.ADMIN_EXIT: admin.exit_admin_panel,
+}
+
+# Labels that start a ConversationHandler; those own their own entry points
+CONVERSATION_ENTRY_LABELS = {reply.ADD_VIDEO, reply.ADMIN_BROADCAST}
+
+def keyboard_labels():
+    """Every button label on every reply keyboard the bot can show."""
+    return {
+        button.text if hasattr(button, 'text') else button
+        for keyboard in reply.reply_keyboards
+        for row in keyboard.keyboard
+        for button in row
+    }
+
+def _build_route_table():
+    labels = keyboard_labels()
+    unknown = set(ROUTES) - labels
+    if unknown:
+        raise ValueError(f"Routes for labels that no keyboard shows: {sorted(unknown)}")
+    unrouted = labels - set(ROUTES) - CONVERSATION_ENTRY_LABELS
+    if unrouted:
+        logger.warning(f"Keyboard buttons without a handler: {sorted(unrouted)}")
+    return dict(ROUTES)
+
+route_table = _build_route_table()
+
+async def dispatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    callback = route_table.get(update.message.text)
+    if callback:
+        return await callback(update, context)
+
+# filters.Text checks `text in strings`, which is a hash lookup on a frozenset
+button_handler = MessageHandler(filters.Text(frozenset(route_table)), dispatch)
@@ -5,7 +5,7 @@ from telegram.ext import ContextTypes, ConversationHandler, CommandHandler, Mess
 
 from ..database import db
 from ..keyboards import reply
-from ..config import MAX_VIDEOS_PER_USER
+from ..config import MAX_VIDEOS_PER_USER, MAX_STRIKES
 from .middleware import check_user_status
 
 # States for ConversationHandler
@@ -106,23 +106,23 @@ async def cancel_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE
 @check_user_status
 async def get_my_videos(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
+    # Active videos only, capped at MAX_VIDEOS_PER_USER
     videos = db.get_user_videos(user_id)
     if not videos:
-        await update.message.reply_text("You haven't added any videos yet. Use '➕ Add Video' to start.")
+        await update.message.reply_text("You don't have any active videos. Use '➕ Add Video' to start.")
         return
 
-    message = "*Your Videos:*\n\n"
+    message = "*Your Active Videos:*\n\n"
     for i, video in enumerate(videos, 1):
-        status = "Active" if video.is_active else "Paused"
         message += (
             f"{i}. *{video.title}* \n"
-            f"   - Status: {status}\n"
             f"   - Views Received: {video.views_received}\n\n"
         )
     await update.message.reply_text(message, parse_mode='Markdown')
 
 @check_user_status
 async def get_my_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Every number here comes from the counters on the user row
     user = db.get_user(update.effective_user.id)
     if not user:
         await update.message.reply_text("Could not fetch your stats. Try starting the bot again with /start.")
@@ -131,8 +131,14 @@ async def get_my_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     stats_text = (
         f"📊 *Your Stats*\n\n"
         f"Strikes: {user.strikes}/{MAX_STRIKES}\n"
-        f"Status: {user.status.capitalize()}\n"
-        # Add more stats here as needed, e.g., tasks completed
+        f"Status: {user.status.capitalize()}\n\n"
+        f"*As a viewer:*\n"
+        f"   - Tasks given: {user.tasks_given}\n"
+        f"   - Completed: {user.tasks_completed}\n"
+        f"   - Rejected: {user.tasks_rejected}\n"
+        f"   - Pending review: {user.tasks_pending_review}\n\n"
+        f"*As a creator:*\n"
+        f"   - Views received: {user.views_received}\n"
     )
     await update.message.reply_text(stats_text, parse_mode='Markdown')
 
@@ -143,15 +149,12 @@ async def toggle_pause_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user = db.get_user(user_id)
     
     new_status = ""
-    new_button_text = ""
     
     if user.status == 'active':
         new_status = 'paused'
-        new_button_text = "▶️ Resume Tasks"
         await update.message.reply_text("⏸️ Your tasks have been paused. You will not receive new tasks until you resume.")
     elif user.status == 'paused':
         new_status = 'active'
-        new_button_text = "⏸️ Pause Tasks"
         await update.message.reply_text("✅ Your tasks have been resumed. You will now receive new tasks.")
     else:
         await update.message.reply_text(f"Your account status is currently '{user.status}'. You cannot change it.")
@@ -159,16 +162,12 @@ async def toggle_pause_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     db.update_user_status(user_id, new_status)
     
-    # Update the keyboard
-    keyboard = reply.main_menu_keyboard.keyboard
-    keyboard[2][1] = new_button_text # This is a bit brittle, a better approach would be to regenerate it
-    
-    await update.message.reply_text("Menu updated.", reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True))
+    await update.message.reply_text("Menu updated.", reply_markup=reply.main_menu(paused=new_status == 'paused'))
 
 
 # Conversation handler for adding a video
 add_video_handler = ConversationHandler(
-    entry_points=[MessageHandler(filters.Regex('^➕ Add Video$'), add_video_start)],
+    entry_points=[MessageHandler(filters.Text([reply.ADD_VIDEO]), add_video_start)],
     states={
         TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, received_title)],
         THUMBNAIL: [MessageHandler(filters.PHOTO, received_thumbnail)],
@@ -2,15 +2,35 @@
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
 
+# --- Button Labels ---
+# Single source for every reply-keyboard label. The keyboards below and the
+# text router in handlers/router.py are both built from these.
+ADD_VIDEO = "➕ Add Video"
+MY_VIDEOS = "📝 My Videos"
+GET_NEXT_TASK = "▶️ Get Next Task"
+REVIEW_QUEUE = "📥 Review Queue"
+MY_STATS = "📊 My Stats"
+PAUSE_TASKS = "⏸️ Pause Tasks"
+RESUME_TASKS = "▶️ Resume Tasks"
+
+ADMIN_STATS = "📊 Stats"
+ADMIN_VIEW_USERS = "👥 View Users"
+ADMIN_BROADCAST = "📢 Broadcast Message"
+ADMIN_SETTINGS = "⚙️ Settings"
+ADMIN_EXIT = "↩️ Exit Admin"
+
 # --- Main Menu Keyboard ---
-main_menu_keyboard = ReplyKeyboardMarkup(
-    [
-        ["➕ Add Video", "📝 My Videos"],
-        ["▶️ Get Next Task"],
-        ["📊 My Stats", "⏸️ Pause Tasks"],
-    ],
-    resize_keyboard=True
-)
+def main_menu(paused: bool = False):
+    return ReplyKeyboardMarkup(
+        [
+            [ADD_VIDEO, MY_VIDEOS],
+            [GET_NEXT_TASK, REVIEW_QUEUE],
+            [MY_STATS, RESUME_TASKS if paused else PAUSE_TASKS],
+        ],
+        resize_keyboard=True
+    )
+
+main_menu_keyboard = main_menu()
 
 # --- Inline Keyboards ---
 def agree_keyboard():
@@ -24,16 +44,31 @@ def proof_review_keyboard(task_id: int):
         ]
     ])
 
+def review_queue_keyboard(task_ids: list, has_next: bool):
+    """Digest keyboard for a page of proofs. Buttons are numbered like the album items."""
+    reject_buttons = [
+        InlineKeyboardButton(f"❌ #{number}", callback_data=f"review_reject_{task_id}")
+        for number, task_id in enumerate(task_ids, 1)
+    ]
+    rows = [reject_buttons[i:i + 5] for i in range(0, len(reject_buttons), 5)]
+    rows.append([InlineKeyboardButton(f"✅ Approve all ({len(task_ids)})", callback_data="review_approve_all")])
+    if has_next:
+        rows.append([InlineKeyboardButton("Next page ▶️", callback_data="review_next")])
+    return InlineKeyboardMarkup(rows)
+
 # --- Admin Keyboards ---
 admin_panel_keyboard = ReplyKeyboardMarkup(
     [
-        ["📊 Stats", "👥 View Users"],
-        ["📢 Broadcast Message"],
-        ["⚙️ Settings", "↩️ Exit Admin"],
+        [ADMIN_STATS, ADMIN_VIEW_USERS],
+        [ADMIN_BROADCAST],
+        [ADMIN_SETTINGS, ADMIN_EXIT],
     ],
     resize_keyboard=True
 )
 
+# Every reply keyboard the bot can show, used to derive the routing table
+reply_keyboards = [main_menu(paused=False), main_menu(paused=True), admin_panel_keyboard]
+
 def admin_settings_keyboard(sub_mode: bool, ai_mode: bool):
     sub_text = "✅ Subscription ON" if sub_mode else "❌ Subscription OFF"
     ai_text = "🤖 AI Moderation ON" if ai_mode else "🤖 AI Moderation OFF"
@@ -41,3 +76,24 @@ def admin_settings_keyboard(sub_mode: bool, ai_mode: bool):
         [InlineKeyboardButton(sub_text, callback_data="toggle_sub_mode")],
         [InlineKeyboardButton(ai_text, callback_data="toggle_ai_mode")]
     ])
+
+USER_BROWSER_FILTERS = [
+    ("All", "all"), ("Active", "active"), ("Paused", "paused"),
+    ("Locked", "locked"), ("Banned", "banned"), ("⚠️ Strikes", "strikes"),
+]
+
+def user_browser_keyboard(active_filter: str, has_prev: bool, has_next: bool):
+    filter_buttons = [
+        InlineKeyboardButton(f"• {label}" if name == active_filter else label, callback_data=f"users_filter_{name}")
+        for label, name in USER_BROWSER_FILTERS
+    ]
+    nav_buttons = []
+    if has_prev:
+        nav_buttons.append(InlineKeyboardButton("◀️ Prev", callback_data="users_page_prev"))
+    if has_next:
+        nav_buttons.append(InlineKeyboardButton("Next ▶️", callback_data="users_page_next"))
+
+    rows = [filter_buttons[:3], filter_buttons[3:]]
+    if nav_buttons:
+        rows.append(nav_buttons)
+    return InlineKeyboardMarkup(rows)
@@ -0,0 +1,159 @@
+# /bot/lifecycle.py
+
+# Graceful drain and shutdown.
+#
+# On SIGTERM/SIGINT the bot:
+#   1. stops fetching new updates,
+#   2. waits (up to DRAIN_TIMEOUT_SECONDS) for running handlers and queued
+#      updates to finish; long loops like broadcasts check is_draining() and
+#      stop early. At the deadline queued updates are discarded and running
+#      handlers are cancelled,
+#   3. flushes batched writes (the event log outbox),
+#   4. checkpoints background jobs. Pending proof timeouts are rebuilt from
+#      the tasks table on the next start, so they only need counting here,
+#   5. stops the Application, which also flushes persistence and the job queue,
+#      giving it at most STOP_GRACE_SECONDS.
+# Drain duration and everything that had to be dropped are published through
+# utils.metrics so deploy windows can be tuned.
+
+import asyncio
+import logging
+import signal
+import time
+
+from telegram.ext import SimpleUpdateProcessor
+
+from . import config
+from .utils import metrics
+
+logger = logging.getLogger(__name__)
+
+STOP_GRACE_SECONDS = 5 # Time left to Application.stop() and cancelled handlers once the drain deadline has passed
+
+class LifecycleState:
+    def __init__(self):
+        self.draining = False
+        self.handlers = set() # Handler tasks currently running
+        self.dropped = {} # What was abandoned during the last drain, by kind
+        self._stop_requested = None # asyncio.Event, created inside the running loop
+
+    def record_dropped(self, kind: str, count: int = 1):
+        self.dropped[kind] = self.dropped.get(kind, 0) + count
+        metrics.increment(f"drain_dropped_{kind}", count)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.handlers)
+
+state = LifecycleState()
+
+def is_draining() -> bool:
+    return state.draining
+
+class TrackingUpdateProcessor(SimpleUpdateProcessor):
+    """
+    Runs each handler coroutine as its own task and keeps it in state.handlers,
+    so a drain knows when it is safe to stop and can cancel what is left at
+    the deadline without killing the application's update fetcher.
+    Keep max_concurrent_updates at 1 to preserve the default sequential,
+    per-user ordered processing.
+    """
+    async def do_process_update(self, update, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        state.handlers.add(task)
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            state.handlers.discard(task)
+        if not task.cancelled():
+            task.result()
+
+def install_signal_handlers():
+    """Makes SIGINT/SIGTERM request a drain instead of killing the loop."""
+    loop = asyncio.get_running_loop()
+    state._stop_requested = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, state._stop_requested.set)
+
+async def wait_for_stop():
+    await state._stop_requested.wait()
+
+async def _wait_until_idle(application, deadline: float) -> bool:
+    while time.monotonic() < deadline:
+        if state.in_flight == 0 and application.update_queue.empty():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+def flush_event_outbox():
+    try:
+        from .database import outbox
+        outbox.export_events(config.EVENT_EXPORT_DIR, config.EVENT_EXPORT_BATCH_SIZE)
+    except Exception as e:
+        logger.warning(f"Could not flush the event outbox: {e}")
+
+async def _drop_remaining(application):
+    """Discards queued updates and cancels running handlers once the drain deadline has passed."""
+    # Every removed update is marked done, otherwise Application.stop() waits on update_queue.join() forever
+    queued = 0
+    while not application.update_queue.empty():
+        application.update_queue.get_nowait()
+        application.update_queue.task_done()
+        queued += 1
+    if queued:
+        state.record_dropped('updates', queued)
+
+    handlers = set(state.handlers)
+    if not handlers:
+        return
+    for task in handlers:
+        task.cancel()
+    await asyncio.wait(handlers, timeout=STOP_GRACE_SECONDS)
+    # Handlers that finished between the deadline and the cancel weren't dropped
+    cancelled = sum(1 for task in handlers if task.cancelled())
+    if cancelled:
+        state.record_dropped('handlers', cancelled)
+
+async def drain(application, flush_outbox: bool = True):
+    """
+    Runs the shutdown sequence described at the top of this module. Pass
+    flush_outbox=False when another process flushes the outbox afterwards.
+    """
+    started = time.monotonic()
+    deadline = started + config.DRAIN_TIMEOUT_SECONDS
+    state.draining = True
+    logger.info(f"Draining: {state.in_flight} handlers in flight, {application.update_queue.qsize()} updates queued")
+
+    # 1. Stop accepting new updates
+    if application.updater and application.updater.running:
+        await application.updater.stop()
+
+    # 2. Let running handlers and already-fetched updates finish
+    if not await _wait_until_idle(application, deadline):
+        logger.warning(f"Drain deadline hit after {config.DRAIN_TIMEOUT_SECONDS}s")
+        await _drop_remaining(application)
+
+    # 3. Flush batched writes
+    if flush_outbox:
+        flush_event_outbox()
+
+    # 4. Checkpoint background jobs
+    if application.job_queue:
+        pending_timeouts = [job for job in application.job_queue.jobs() if job.name and job.name.startswith("proof_timeout_")]
+        metrics.set_gauge("drain_proof_timeouts_checkpointed", len(pending_timeouts))
+
+    # 5. Stop the application (job queue, persistence)
+    if application.running:
+        try:
+            await asyncio.wait_for(application.stop(), max(deadline - time.monotonic(), STOP_GRACE_SECONDS))
+        except asyncio.TimeoutError:
+            # stop() marks the application as not running first, so shutdown still works
+            state.record_dropped('stop_timeouts')
+            logger.warning("Application did not stop in time, abandoning its running jobs")
+
+    duration = time.monotonic() - started
+    metrics.set_gauge("drain_seconds", duration)
+    logger.info(f"Drain finished in {duration:.2f}s, dropped: {state.dropped or 'nothing'}")
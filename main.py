@@ -1,12 +1,12 @@
 # /bot/main.py
 
+import asyncio
 import logging
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler
+import time
+from contextlib import contextmanager
 
 from . import config
-from .database import db
-from .handlers import user, admin, proof
-from .keyboards import reply
+from .utils import metrics
 
 # Enable logging
 logging.basicConfig(
@@ -14,48 +14,137 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main() -> None:
-    """Start the bot."""
-    # Initialize the database
-    db.init_db()
-    
-    # Load settings from DB into memory on start
-    db.load_settings()
-    logger.info(f"Settings loaded: Sub mode={config.bot_settings.subscription_mode}, AI mode={config.bot_settings.ai_moderation_mode}")
-
+@contextmanager
+def startup_phase(timings: dict, name: str):
+    """Times one startup phase and records it as a `startup_<name>_seconds` gauge."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - started
+        metrics.set_gauge(f"startup_{name}_seconds", timings[name])
 
-    # Create the Application and pass it your bot's token.
-    application = Application.builder().token(config.BOT_TOKEN).build()
-    
-    # --- Register all handlers ---
+def register_handlers(application) -> None:
+    from telegram.ext import CommandHandler, CallbackQueryHandler
+    from .handlers import user, admin, proof, router
 
     # Core user commands
     application.add_handler(CommandHandler("start", user.start))
     application.add_handler(CallbackQueryHandler(user.agree_rules_callback, pattern="^agree_rules$"))
 
-    # User menu commands
+    # Conversations first, so their state handlers see text before anything else
     application.add_handler(user.add_video_handler)
-    application.add_handler(MessageHandler(filters.Regex('^📝 My Videos$'), user.get_my_videos))
-    application.add_handler(MessageHandler(filters.Regex('^📊 My Stats$'), user.get_my_stats))
-    application.add_handler(MessageHandler(filters.Regex('^(⏸️ Pause Tasks|▶️ Resume Tasks)$'), user.toggle_pause_tasks))
+    application.add_handler(admin.broadcast_handler)
 
+    # All menu buttons, dispatched by exact label
+    application.add_handler(router.button_handler)
 
-    # Proof and task handling
+    # Proof and task handling (ends with the free-text catch-all)
     for handler in proof.proof_handlers:
         application.add_handler(handler)
 
     # Admin panel
-    application.add_handler(admin.broadcast_handler)
     for handler in admin.admin_handlers:
         application.add_handler(handler)
-        
+
     logger.info("All handlers registered.")
 
-    # Run the bot until the user presses Ctrl-C
+def schedule_jobs(application) -> None:
+    from .handlers import jobs, proof
+
+    rescheduled = proof.reschedule_proof_timeouts(application.job_queue)
+    logger.info(f"Rescheduled {rescheduled} pending proof timeouts")
+
+    application.job_queue.run_repeating(
+        jobs.expire_stale_tasks_job,
+        interval=config.TASK_EXPIRY_SWEEP_INTERVAL_MINUTES * 60,
+        first=60,
+        name="task_expiry_sweep"
+    )
+    application.job_queue.run_repeating(
+        jobs.expire_subscriptions_job,
+        interval=config.SUBSCRIPTION_SWEEP_INTERVAL_MINUTES * 60,
+        first=0,
+        name="subscription_expiry_sweep"
+    )
+    application.job_queue.run_repeating(
+        jobs.export_events_job,
+        interval=config.EVENT_EXPORT_INTERVAL_SECONDS,
+        first=config.EVENT_EXPORT_INTERVAL_SECONDS,
+        name="event_export"
+    )
+
+def build_application(with_jobs: bool = True, with_updater: bool = True, update_queue_size: int = 0):
+    """
+    Bootstraps the database and returns a fully wired Application.
+    Sharded workers (see workers.py) pass with_updater=False because updates
+    reach them from the front process, and only one of them gets with_jobs.
+    A non-zero update_queue_size bounds the Application's update queue.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    # Heavy modules are imported here rather than at module level so the
+    # breakdown below shows what they actually cost.
+    with startup_phase(timings, "import"):
+        from telegram.ext import Application
+        from .database import db
+        from .lifecycle import TrackingUpdateProcessor
+
+    with startup_phase(timings, "db_bootstrap"):
+        # Only rebuilds the schema when SCHEMA_VERSION changed
+        rebuilt = db.init_db()
+        # Load settings from DB into memory on start
+        db.load_settings()
+    logger.info(f"Schema {'rebuilt' if rebuilt else 'current'} (v{db.SCHEMA_VERSION}). Settings v{config.bot_settings.version} loaded: Sub mode={config.bot_settings.subscription_mode}, AI mode={config.bot_settings.ai_moderation_mode}, Price={config.bot_settings.subscription_price}")
+
+    with startup_phase(timings, "handlers"):
+        # Create the Application and pass it your bot's token.
+        builder = (
+            Application.builder().token(config.BOT_TOKEN).base_url(config.BOT_API_URL)
+            .concurrent_updates(TrackingUpdateProcessor(1))
+        )
+        if not with_updater:
+            builder = builder.updater(None)
+        if update_queue_size:
+            builder = builder.update_queue(asyncio.Queue(maxsize=update_queue_size))
+        application = builder.build()
+        register_handlers(application)
+        if with_jobs:
+            schedule_jobs(application)
+
+    total = time.perf_counter() - started
+    metrics.set_gauge("startup_total_seconds", total)
+    breakdown = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items())
+    logger.info(f"Startup took {total * 1000:.0f}ms ({breakdown})")
+    if total > config.STARTUP_BUDGET_SECONDS:
+        logger.warning(f"Startup exceeded its {config.STARTUP_BUDGET_SECONDS}s budget")
+    return application
+
+def main() -> None:
+    """Start the bot."""
+    if config.WORKER_COUNT > 1:
+        from . import workers
+        workers.run(config.WORKER_COUNT)
+        return
+
+    application = build_application()
+
+    # Run the bot until SIGINT/SIGTERM, then drain in-flight work
     # For production, you might want to use webhooks.
     # Read more: https://docs.python-telegram-bot.org/en/stable/telegram.ext.application.html#telegram.ext.Application.run_webhook
     logger.info("Starting bot polling...")
-    application.run_polling()
+    asyncio.run(run_until_stopped(application))
+
+async def run_until_stopped(application) -> None:
+    from . import lifecycle
+
+    lifecycle.install_signal_handlers()
+    async with application:
+        await application.start()
+        await application.updater.start_polling()
+        await lifecycle.wait_for_stop()
+        await lifecycle.drain(application)
 
 
 if __name__ == "__main__":
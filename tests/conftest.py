@@ -0,0 +1,66 @@
+# Test setup.
+#
+# The bot is imported as a package named after the repository directory (it
+# uses relative imports), against a throwaway SQLite database. Both have to be
+# in place before config is first imported.
+
+import importlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+from telegram.request import BaseRequest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+# Inherited by processes the tests spawn, so they open the same database
+_data_dir = os.environ.setdefault("BOT_TESTS_DATA_DIR", tempfile.mkdtemp(prefix="bot-tests-"))
+os.environ["BOT_TOKEN"] = "123456:TEST"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_data_dir, 'bot_database.db')}"
+os.environ["EVENT_EXPORT_DIR"] = os.path.join(_data_dir, "event_log")
+
+def load(module: str):
+    """Imports a bot module by its path inside the package, e.g. load('database.db')."""
+    return importlib.import_module(f"{PACKAGE}.{module}")
+
+class StubRequest(BaseRequest):
+    """Answers Bot API calls locally: getMe returns a bot user, everything else True."""
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None, write_timeout=None, connect_timeout=None, pool_timeout=None):
+        if url.endswith("/getMe"):
+            result = {"id": 123456, "is_bot": True, "first_name": "Test", "username": "test_bot"}
+        elif url.endswith("/getUpdates"):
+            result = []
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+@pytest.fixture(scope="session")
+def db():
+    module = load("database.db")
+    module.init_db()
+    return module
+
+_user_ids = itertools.count(9_000_000)
+
+@pytest.fixture
+def new_task(db):
+    """Makes a fresh viewer (and a video owner) and returns an assigned TaskRecord for that viewer."""
+    def make():
+        owner_id, viewer_id = next(_user_ids), next(_user_ids)
+        db.get_or_create_user(owner_id, f"owner{owner_id}")
+        db.get_or_create_user(viewer_id, f"viewer{viewer_id}")
+        db.add_video(owner_id, f"Video {owner_id}", "thumb", "https://example.com/v", 1, "Watch it")
+        # Any active video can be handed out, not necessarily the one added above
+        return db.get_task_by_id(db.get_task_for_user(viewer_id).id)
+    return make
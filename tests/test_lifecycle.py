@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from telegram.ext import Application, TypeHandler
+
+from conftest import StubRequest, load
+
+lifecycle = load("lifecycle")
+config = load("config")
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(lifecycle, "state", lifecycle.LifecycleState())
+    monkeypatch.setattr(config, "DRAIN_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(config, "EVENT_EXPORT_DIR", str(tmp_path))
+
+def _application(callback):
+    application = (
+        Application.builder().token(config.BOT_TOKEN).request(StubRequest()).get_updates_request(StubRequest())
+        .updater(None).concurrent_updates(lifecycle.TrackingUpdateProcessor(1)).build()
+    )
+    application.add_handler(TypeHandler(dict, callback))
+    return application
+
+async def _drain_with(callback, updates: int) -> float:
+    application = _application(callback)
+    async with application:
+        await application.start()
+        for i in range(updates):
+            await application.update_queue.put({"n": i})
+        await asyncio.sleep(0.1) # Let the first handler start
+        started = time.monotonic()
+        await lifecycle.drain(application)
+        return time.monotonic() - started
+
+def test_drain_cancels_stuck_handler_and_drops_queue():
+    async def stuck(update, context):
+        await asyncio.sleep(3600)
+
+    duration = asyncio.run(asyncio.wait_for(_drain_with(stuck, 3), 10))
+
+    assert duration < config.DRAIN_TIMEOUT_SECONDS + 2
+    assert lifecycle.state.dropped == {"handlers": 1, "updates": 2}
+    assert lifecycle.state.in_flight == 0
+
+def test_drain_lets_short_handlers_finish():
+    handled = []
+
+    async def quick(update, context):
+        await asyncio.sleep(0.05)
+        handled.append(update["n"])
+
+    asyncio.run(asyncio.wait_for(_drain_with(quick, 3), 10))
+
+    assert handled == [0, 1, 2]
+    assert lifecycle.state.dropped == {}
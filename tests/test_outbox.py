@@ -0,0 +1,70 @@
+import itertools
+import json
+import os
+
+from sqlalchemy import func, select
+
+from conftest import load
+
+outbox = load("database.outbox")
+models = load("database.models")
+
+_user_ids = itertools.count(9_600_000)
+
+def _exported_ids(directory: str) -> list:
+    ids = []
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            ids.extend(json.loads(line)['id'] for line in f)
+    return ids
+
+def _last_event_id(db) -> int:
+    with db.engine.connect() as conn:
+        return conn.execute(select(func.max(models.Event.id))).scalar() or 0
+
+def _append_strikes(db, count: int) -> int:
+    user_id = next(_user_ids)
+    db.get_or_create_user(user_id, f"outbox{user_id}")
+    for _ in range(count):
+        db.add_strike(user_id)
+    return user_id
+
+def test_export_catches_up_and_checkpoints(db, tmp_path):
+    _append_strikes(db, 3)
+    last = _last_event_id(db)
+
+    exported = outbox.export_events(str(tmp_path), batch_size=2, name='test_catch_up')
+    ids = _exported_ids(tmp_path)
+    assert ids == sorted(set(ids))
+    assert exported == len(ids)
+    assert ids[-1] == last
+    assert outbox.get_cursor('test_catch_up') == last
+
+def test_export_resumes_after_the_cursor(db, tmp_path):
+    outbox.export_events(str(tmp_path), batch_size=50, name='test_resume')
+    before = _exported_ids(tmp_path)
+    cursor = outbox.get_cursor('test_resume')
+
+    _append_strikes(db, 3)
+    new_ids = list(range(cursor + 1, _last_event_id(db) + 1))
+    assert outbox.export_events(str(tmp_path), batch_size=50, name='test_resume') == len(new_ids)
+    assert _exported_ids(tmp_path) == before + new_ids
+    assert outbox.get_cursor('test_resume') == new_ids[-1]
+
+    # Caught up, nothing is written twice
+    assert outbox.export_events(str(tmp_path), batch_size=50, name='test_resume') == 0
+    assert _exported_ids(tmp_path) == before + new_ids
+
+def test_max_batches_stops_early_and_the_next_run_continues(db, tmp_path):
+    outbox.export_events(str(tmp_path / "skip"), name='test_max_batches')
+    cursor = outbox.get_cursor('test_max_batches')
+    _append_strikes(db, 5)
+    new_ids = list(range(cursor + 1, _last_event_id(db) + 1))
+
+    directory = str(tmp_path / "export")
+    assert outbox.export_events(directory, batch_size=2, name='test_max_batches', max_batches=2) == 4
+    assert _exported_ids(directory) == new_ids[:4]
+    assert outbox.get_cursor('test_max_batches') == new_ids[3]
+
+    assert outbox.export_events(directory, batch_size=2, name='test_max_batches') == len(new_ids) - 4
+    assert _exported_ids(directory) == new_ids
@@ -0,0 +1,25 @@
+from conftest import load
+
+records = load("database.records")
+
+def test_same_file_submitted_for_two_tasks_at_once(db, new_task):
+    first, second = new_task(), new_task()
+
+    # Both submissions passed find_proof_fingerprint before either was written
+    accepted = db.update_task_with_proof(first.id, "file-a", "video", "shared-unique-id", 1000, 30)
+    duplicate = db.update_task_with_proof(second.id, "file-b", "video", "shared-unique-id", 1000, 30)
+
+    assert accepted.status == 'proof_submitted'
+    assert duplicate == records.DuplicateProof(second.id, first.id)
+    assert db.get_task_by_id(second.id).status == 'assigned'
+    assert db.get_user(second.viewer_id).tasks_pending_review == 0
+    assert db.find_proof_fingerprint("shared-unique-id").task_id == first.id
+
+def test_backfill_keeps_the_first_task_per_file(db, new_task):
+    first, second = new_task(), new_task()
+    rows = [
+        {'file_unique_id': "backfilled-id", 'task_id': task.id, 'viewer_id': task.viewer_id, 'file_size': None, 'duration': None}
+        for task in (first, second)
+    ]
+    assert db.add_proof_fingerprints(rows) == 1
+    assert db.find_proof_fingerprint("backfilled-id").task_id == first.id
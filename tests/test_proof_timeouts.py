@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import update
+
+from conftest import load
+
+config = load("config")
+models = load("database.models")
+proof = load("handlers.proof")
+
+class RecordingJobQueue:
+    def __init__(self):
+        self.jobs = {}
+
+    def run_once(self, callback, when, data, name):
+        self.jobs[name] = SimpleNamespace(callback=callback, when=when, data=data)
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+def _submitted_proof(db, new_task, minutes_ago: int):
+    task = new_task()
+    db.update_task_with_proof(task.id, f"file{task.id}", "photo", f"timeout{task.id}", 100, None)
+    with db.get_db() as session:
+        session.execute(
+            update(models.Task).where(models.Task.id == task.id)
+            .values(updated_at=datetime.datetime.utcnow() - datetime.timedelta(minutes=minutes_ago))
+        )
+        session.commit()
+    return task
+
+def _fire(job) -> RecordingBot:
+    bot = RecordingBot()
+    asyncio.run(job.callback(SimpleNamespace(job=job, bot=bot)))
+    return bot
+
+def test_reschedule_keeps_remaining_time_and_strike(db, new_task):
+    task = _submitted_proof(db, new_task, minutes_ago=5)
+    job_queue = RecordingJobQueue()
+    proof.reschedule_proof_timeouts(job_queue)
+
+    job = job_queue.jobs[f"proof_timeout_{task.id}"]
+    remaining = (config.PROOF_REVIEW_TIMEOUT_MINUTES - 5) * 60
+    assert remaining - 60 < job.when <= remaining
+    assert job.data == {'task_id': task.id, 'viewer_id': task.viewer_id, 'strike': True}
+
+    strikes = db.get_user(task.owner_id).strikes
+    _fire(job)
+    assert db.get_task_by_id(task.id).status == 'completed'
+    assert db.get_user(task.owner_id).strikes == strikes + 1
+
+def test_proofs_overdue_after_downtime_are_approved_without_strike(db, new_task):
+    task = _submitted_proof(db, new_task, minutes_ago=config.PROOF_REVIEW_TIMEOUT_MINUTES + 30)
+    job_queue = RecordingJobQueue()
+    proof.reschedule_proof_timeouts(job_queue)
+
+    job = job_queue.jobs[f"proof_timeout_{task.id}"]
+    assert job.when == 0
+    assert job.data['strike'] is False
+
+    strikes = db.get_user(task.owner_id).strikes
+    bot = _fire(job)
+    assert db.get_task_by_id(task.id).status == 'completed'
+    assert db.get_user(task.owner_id).strikes == strikes
+    assert "No strike" in dict(bot.sent)[task.owner_id]
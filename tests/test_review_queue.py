@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import event
+
+@pytest.fixture
+def pending_proof(db, new_task):
+    """A proof awaiting review: returns (owner_id, task_id)."""
+    task = new_task()
+    db.update_task_with_proof(task.id, f"file{task.id}", "photo", f"unique{task.id}", 100, None)
+    return task.owner_id, task.id
+
+def test_invalidate_rejects_pending_proof(db, pending_proof):
+    owner_id, task_id = pending_proof
+    task = db.invalidate_task(task_id, "not watched")
+    assert task.status == 'invalid_proof'
+    assert db.get_task_by_id(task_id).status == 'invalid_proof'
+    assert db.get_user(task.viewer_id).tasks_pending_review == 0
+
+def test_invalidate_leaves_reviewed_proof_alone(db, pending_proof):
+    owner_id, task_id = pending_proof
+    approved, _ = db.complete_tasks([task_id], owner_id)
+    assert [task.id for task in approved] == [task_id]
+
+    # e.g. auto-approved by a timeout while the owner was typing the reason
+    assert db.invalidate_task(task_id, "too late") is None
+    task = db.get_task_by_id(task_id)
+    assert task.status == 'completed'
+    assert db.get_user(task.viewer_id).tasks_rejected == 0
+
+def test_rejected_proof_is_not_bulk_approved(db, pending_proof):
+    owner_id, task_id = pending_proof
+    db.invalidate_task(task_id, "not watched")
+    approved, _ = db.complete_tasks([task_id], owner_id)
+    assert approved == []
+    assert db.get_task_by_id(task_id).status == 'invalid_proof'
+
+def test_review_page_only_reads_the_owners_proofs(db, pending_proof):
+    owner_id, task_id = pending_proof
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        page = db.get_pending_proofs_for_owner(owner_id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert task_id in [task.id for task in page]
+    statement, parameters = captured[-1]
+    with db.engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_tasks_video_id_status (video_id=? AND status=?)" in plan
+    assert "ix_tasks_status_created_at" not in plan
+
+def test_bulk_approve_returns_completed_records(db, pending_proof):
+    owner_id, task_id = pending_proof
+    approved, _ = db.complete_tasks([task_id], owner_id)
+    assert [(task.id, task.status) for task in approved] == [(task_id, 'completed')]
+    assert db.get_task_by_id(task_id).status == 'completed'
@@ -0,0 +1,29 @@
+import datetime
+
+from telegram import Chat, Message, Update, User
+
+from conftest import load
+
+router = load("handlers.router")
+reply = load("keyboards.reply")
+
+def _text_update(text: str) -> Update:
+    message = Message(
+        message_id=1, date=datetime.datetime.now(datetime.timezone.utc), chat=Chat(1, Chat.PRIVATE),
+        from_user=User(1, "Test", False), text=text,
+    )
+    return Update(1, message=message)
+
+def test_every_keyboard_button_is_routed():
+    assert set(router.route_table) == router.keyboard_labels() - router.CONVERSATION_ENTRY_LABELS
+
+def test_conversation_entry_labels_are_left_to_their_conversations():
+    assert router.CONVERSATION_ENTRY_LABELS <= router.keyboard_labels()
+    for label in router.CONVERSATION_ENTRY_LABELS:
+        assert not router.button_handler.check_update(_text_update(label))
+
+def test_button_handler_matches_exact_labels_only():
+    for label in router.route_table:
+        assert router.button_handler.check_update(_text_update(label))
+    assert not router.button_handler.check_update(_text_update(f"{reply.MY_STATS} please"))
+    assert not router.button_handler.check_update(_text_update("not watched till the end"))
@@ -0,0 +1,68 @@
+import multiprocessing
+
+import pytest
+
+from conftest import load
+
+config = load("config")
+
+def _settings_process(conn):
+    """Runs db calls sent by the test and answers with the result and the process' settings."""
+    db = load("database.db")
+    db.load_settings()
+    while True:
+        call = conn.recv()
+        if call is None:
+            break
+        name, args = call
+        result = getattr(db, name)(*args)
+        settings = config.bot_settings
+        conn.send((result, settings.version, settings.subscription_mode, settings.ai_moderation_mode, settings.subscription_price))
+
+class SettingsProcess:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_settings_process, args=(child,))
+        self.process.start()
+
+    def call(self, name: str, *args):
+        self.conn.send((name, args))
+        assert self.conn.poll(30), f"{name} did not answer"
+        return self.conn.recv()
+
+    def stop(self):
+        self.conn.send(None)
+        self.process.join(10)
+
+@pytest.fixture
+def processes(db):
+    ctx = multiprocessing.get_context("spawn")
+    pair = SettingsProcess(ctx), SettingsProcess(ctx)
+    yield pair
+    for process in pair:
+        process.stop()
+    # Put the defaults back for the other tests
+    db.update_setting('subscription_mode', False)
+    db.update_setting('ai_moderation_mode', False)
+    db.update_setting_value('subscription_price', str(config.DEFAULT_SUB_PRICE))
+    db.refresh_settings(force=True)
+
+def test_settings_changes_reach_the_other_process(db, processes):
+    a, b = processes
+    _, start, *_ = a.call("refresh_settings", True)
+
+    # A writes: it adopts the version it created, B sees it on its next refresh
+    assert a.call("update_setting", "subscription_mode", True) == (True, start + 1, True, False, config.DEFAULT_SUB_PRICE)
+    assert b.call("refresh_settings", True) == (True, start + 1, True, False, config.DEFAULT_SUB_PRICE)
+    assert b.call("refresh_settings", True)[0] is False
+
+    # B writes while A is behind: A must not adopt the newer version blindly...
+    assert b.call("update_setting_value", "subscription_price", "77") == (True, start + 2, True, False, 77)
+    result, version, *settings = a.call("update_setting", "ai_moderation_mode", True)
+    assert result is True
+    assert version == start + 1
+    assert settings == [True, True, config.DEFAULT_SUB_PRICE]
+
+    # ...so its next refresh reloads everything, including B's change
+    assert a.call("refresh_settings", True) == (True, start + 3, True, True, 77)
+    assert b.call("refresh_settings", True) == (True, start + 3, True, True, 77)
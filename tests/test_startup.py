@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import PACKAGE, ROOT, load
+
+config = load("config")
+
+_STARTUP = f"""
+import json, sys
+sys.path.insert(0, {os.path.dirname(ROOT)!r})
+from {PACKAGE}.main import build_application
+from {PACKAGE}.database import db
+from {PACKAGE}.utils import metrics
+build_application()
+print(json.dumps({{
+    'startup_total_seconds': metrics.snapshot()['gauges']['startup_total_seconds'],
+    'init_db_again': db.init_db(),
+    'schema_version': db.get_schema_version(),
+}}))
+"""
+
+def _start_bot(data_dir) -> dict:
+    """Builds the application in a fresh interpreter, so imports are cold like in production."""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{data_dir / 'bot_database.db'}",
+        EVENT_EXPORT_DIR=str(data_dir / "event_log"),
+    )
+    result = subprocess.run([sys.executable, "-c", _STARTUP], env=env, cwd=data_dir, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_startup_stays_within_budget(tmp_path):
+    db = load("database.db")
+    fresh = _start_bot(tmp_path)
+    assert fresh['startup_total_seconds'] < config.STARTUP_BUDGET_SECONDS
+    assert fresh['init_db_again'] is False
+    assert fresh['schema_version'] == db.SCHEMA_VERSION
+
+    # Restarting against the existing database must not rebuild anything
+    warm = _start_bot(tmp_path)
+    assert warm['startup_total_seconds'] < config.STARTUP_BUDGET_SECONDS
+    assert warm['init_db_again'] is False
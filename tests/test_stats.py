@@ -0,0 +1,46 @@
+import threading
+
+from sqlalchemy import event, func, select
+
+from conftest import load
+
+models = load("database.models")
+
+def _nonzero(counters: dict) -> dict:
+    return {name: value for name, value in counters.items() if value}
+
+def test_write_time_rollups_match_rebuild(db, new_task):
+    completed, rejected, pending, assigned = new_task(), new_task(), new_task(), new_task()
+    for task in (completed, rejected, pending):
+        db.update_task_with_proof(task.id, f"file{task.id}", "photo", f"stats{task.id}", 100, None)
+    db.complete_tasks([completed.id], completed.owner_id)
+    db.invalidate_task(rejected.id, "not watched")
+    db.add_strike(rejected.viewer_id)
+    db.update_user_status(assigned.viewer_id, 'paused')
+
+    counters, daily = db.get_stats()
+    rebuilt = db.rebuild_stats(chunk_size=2)
+
+    assert _nonzero(rebuilt) == _nonzero(counters)
+    assert _nonzero(db.get_stats()[0]) == _nonzero(counters)
+    assert db.get_stats()[1] == daily
+
+def test_strike_during_rebuild_is_not_lost(db, new_task):
+    viewer_id = new_task().viewer_id
+    striker = threading.Thread(target=db.add_strike, args=(viewer_id,))
+
+    def strike_mid_scan(conn, cursor, statement, parameters, context, executemany):
+        # Users have been counted by now; a strike committed here must survive the swap
+        if statement.startswith("SELECT videos.is_active") and not striker.ident:
+            striker.start()
+            striker.join(1) # Returns early only if the write wasn't held back
+    event.listen(db.engine, "before_cursor_execute", strike_mid_scan)
+    try:
+        db.rebuild_stats()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", strike_mid_scan)
+    striker.join()
+
+    with db.engine.connect() as conn:
+        strikes = conn.execute(select(func.sum(models.User.strikes))).scalar()
+    assert db.get_stats()[0]['strikes_total'] == strikes
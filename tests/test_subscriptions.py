@@ -0,0 +1,44 @@
+import datetime
+import itertools
+
+from sqlalchemy import event, update
+
+from conftest import load
+
+models = load("database.models")
+
+_ids = itertools.count(9_300_000)
+
+def test_sweep_switches_off_only_lapsed_subscriptions(db):
+    lapsed, current = next(_ids), next(_ids)
+    for user_id in (lapsed, current):
+        db.get_or_create_user(user_id, f"user{user_id}")
+    db.grant_subscription(current, 30)
+    db.grant_subscription(lapsed, 30)
+    with db.get_db() as session:
+        session.execute(
+            update(models.User).where(models.User.user_id == lapsed)
+            .values(subscription_expiry=datetime.datetime.utcnow() - datetime.timedelta(days=1))
+        )
+        session.commit()
+
+    assert db.expire_subscriptions() >= 1
+    assert db.get_user(lapsed).is_subscribed is False
+    assert db.get_user(current).is_subscribed is True
+    assert db.expire_subscriptions() == 0
+
+def test_sweep_only_scans_subscribed_users(db):
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE users"):
+            captured.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        db.expire_subscriptions()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[0]
+    with db.engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_users_is_subscribed_expiry (is_subscribed=?" in plan
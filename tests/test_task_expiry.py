@@ -0,0 +1,45 @@
+import datetime
+import itertools
+
+from sqlalchemy import event, select
+
+from conftest import load
+
+models = load("database.models")
+
+_ids = itertools.count(9_200_000)
+
+def _assigned_task(db) -> int:
+    owner_id, viewer_id = next(_ids), next(_ids)
+    db.get_or_create_user(owner_id, f"owner{owner_id}")
+    db.get_or_create_user(viewer_id, f"viewer{viewer_id}")
+    db.add_video(owner_id, "Expire me", "thumb", "https://example.com/v", 1, "Watch it")
+    return db.get_task_for_user(viewer_id).id
+
+def _expired_events(db, task_ids) -> list:
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(models.Event.task_id).where(models.Event.event_type == 'expired', models.Event.task_id.in_(task_ids))
+        ).scalars().all()
+
+def test_expiry_reports_only_tasks_it_changed(db):
+    kept, stale = _assigned_task(db), _assigned_task(db)
+
+    # The viewer sends a proof for `kept` between the sweep's SELECT and its UPDATE
+    raced = []
+    def submit_proof_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE tasks") and not raced:
+            raced.append(kept)
+            cursor.connection.execute("UPDATE tasks SET status = 'proof_submitted' WHERE id = ?", (kept,))
+    event.listen(db.engine, "before_cursor_execute", submit_proof_first)
+    try:
+        expired = db.expire_stale_tasks(datetime.datetime.utcnow() + datetime.timedelta(minutes=1), batch_size=500)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", submit_proof_first)
+
+    expired_ids = {task_id for task_id, _ in expired}
+    assert stale in expired_ids
+    assert kept not in expired_ids
+    assert _expired_events(db, [kept, stale]) == [stale]
+    assert db.get_task_by_id(kept).status == 'proof_submitted'
+    assert db.get_task_by_id(stale).status == 'expired'
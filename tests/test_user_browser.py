@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import event
+
+PAGE = 4
+
+@pytest.fixture(scope="module")
+def pager_users(db):
+    """Pager_NN users, every third banned, with 500+ strikes so a strike filter only finds them."""
+    users = []
+    for n in range(25):
+        user_id = 9_400_000 + n
+        username = f"{'Pager' if n % 2 else 'pager'}_{n:02d}"
+        db.get_or_create_user(user_id, username)
+        db.add_strike(user_id, 500 + n % 5)
+        status = 'banned' if n % 3 == 0 else 'active'
+        if status != 'active':
+            db.update_user_status(user_id, status)
+        users.append({'user_id': user_id, 'username': username, 'status': status, 'strikes': 500 + n % 5})
+    # Neighbours that share the first letters but not the prefix
+    db.get_or_create_user(9_400_100, "pages")
+    db.get_or_create_user(9_400_101, "pagez")
+    return users
+
+def _walk_forward(db, **filters) -> list:
+    pages, after = [], None
+    while True:
+        rows, has_more = db.get_users_page(after=after, limit=PAGE, **filters)
+        pages.append(rows)
+        if not has_more:
+            return pages
+        after = rows[-1][1]
+
+def _user_ids(pages) -> list:
+    return [record.user_id for rows in pages for record, _ in rows]
+
+def test_prefix_search_pages_forward_case_insensitively(db, pager_users):
+    pages = _walk_forward(db, username_prefix="@PAGER_")
+    expected = sorted(pager_users, key=lambda user: (user['username'].lower(), user['user_id']))
+    assert _user_ids(pages) == [user['user_id'] for user in expected]
+    assert all(len(rows) == PAGE for rows in pages[:-1])
+
+def test_prefix_range_stops_at_the_prefix(db, pager_users):
+    rows, _ = db.get_users_page(username_prefix="page", limit=100)
+    usernames = {record.username for record, _ in rows}
+    assert {"pages", "pagez"} <= usernames
+    rows, _ = db.get_users_page(username_prefix="pager", limit=100)
+    assert not {"pages", "pagez"} & {record.username for record, _ in rows}
+
+def test_previous_page_is_the_page_before(db, pager_users):
+    pages = _walk_forward(db, username_prefix="pager_")
+    for index in range(1, len(pages)):
+        rows, has_more = db.get_users_page(before=pages[index][0][1], limit=PAGE, username_prefix="pager_")
+        assert rows == pages[index - 1]
+        assert has_more == (index > 1)
+
+def test_status_and_prefix_filter_together(db, pager_users):
+    pages = _walk_forward(db, status='banned', username_prefix="pager_")
+    expected = sorted((user for user in pager_users if user['status'] == 'banned'), key=lambda user: user['username'].lower())
+    assert _user_ids(pages) == [user['user_id'] for user in expected]
+
+def test_strike_filter_orders_by_strikes(db, pager_users):
+    pages = _walk_forward(db, status='active', min_strikes=503)
+    expected = sorted(
+        (user for user in pager_users if user['status'] == 'active' and user['strikes'] >= 503),
+        key=lambda user: (user['strikes'], user['user_id'])
+    )
+    assert _user_ids(pages) == [user['user_id'] for user in expected]
+    keys = [key for rows in pages for _, key in rows]
+    assert keys == sorted(keys)
+
+def test_status_and_prefix_is_one_index_range(db, pager_users):
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        db.get_users_page(status='banned', username_prefix="pager_", limit=PAGE)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    with db.engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_users_status_username_lower_id (status=? AND <expr>>? AND <expr><?)" in plan
+    assert "TEMP B-TREE" not in plan
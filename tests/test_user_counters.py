@@ -0,0 +1,67 @@
+# The per-user activity counters are bumped on every task transition and must
+# agree with what the rebuild recomputes from the tasks and videos tables.
+
+COUNTERS = ('tasks_given', 'tasks_completed', 'tasks_rejected', 'tasks_pending_review', 'views_received')
+
+def _counters(db, user_id: int) -> dict:
+    user = db.get_user(user_id)
+    return {name: getattr(user, name) for name in COUNTERS}
+
+def _delta(before: dict, after: dict) -> dict:
+    return {name: after[name] - before[name] for name in COUNTERS if after[name] != before[name]}
+
+def _submit(db, task):
+    db.update_task_with_proof(task.id, f"file{task.id}", "photo", f"counters{task.id}", 100, None)
+
+def test_assign_and_submit(db, new_task):
+    task = new_task()
+    assigned = _counters(db, task.viewer_id)
+    assert assigned['tasks_given'] == 1
+    _submit(db, task)
+    assert _delta(assigned, _counters(db, task.viewer_id)) == {'tasks_pending_review': 1}
+
+def test_complete(db, new_task):
+    task = new_task()
+    _submit(db, task)
+    viewer, owner = _counters(db, task.viewer_id), _counters(db, task.owner_id)
+    assert db.complete_task(task.id)
+    assert _delta(viewer, _counters(db, task.viewer_id)) == {'tasks_pending_review': -1, 'tasks_completed': 1}
+    assert _delta(owner, _counters(db, task.owner_id)) == {'views_received': 1}
+
+def test_invalidate(db, new_task):
+    task = new_task()
+    _submit(db, task)
+    viewer, owner = _counters(db, task.viewer_id), _counters(db, task.owner_id)
+    db.invalidate_task(task.id, "not watched")
+    assert _delta(viewer, _counters(db, task.viewer_id)) == {'tasks_pending_review': -1, 'tasks_rejected': 1}
+    assert _delta(owner, _counters(db, task.owner_id)) == {}
+
+def test_bulk_approve(db, new_task):
+    tasks = [new_task() for _ in range(3)]
+    for task in tasks:
+        _submit(db, task)
+    # Bulk approval is per owner; any other owner's tasks are skipped
+    owner_id = tasks[0].owner_id
+    mine = [task for task in tasks if task.owner_id == owner_id]
+    viewers = {task.viewer_id: _counters(db, task.viewer_id) for task in tasks}
+    owner = _counters(db, owner_id)
+
+    approved, _ = db.complete_tasks([task.id for task in tasks], owner_id)
+    assert sorted(task.id for task in approved) == sorted(task.id for task in mine)
+    for task in tasks:
+        expected = {'tasks_pending_review': -1, 'tasks_completed': 1} if task in mine else {}
+        assert _delta(viewers[task.viewer_id], _counters(db, task.viewer_id)) == expected
+    assert _delta(owner, _counters(db, owner_id)) == {'views_received': len(mine)}
+
+def test_rebuild_agrees_with_bumped_counters(db, new_task):
+    completed, rejected, pending, bulk = (new_task() for _ in range(4))
+    for task in (completed, rejected, pending, bulk):
+        _submit(db, task)
+    db.complete_task(completed.id)
+    db.invalidate_task(rejected.id, "not watched")
+    db.complete_tasks([bulk.id], bulk.owner_id)
+
+    user_ids = {user_id for task in (completed, rejected, pending, bulk) for user_id in (task.viewer_id, task.owner_id)}
+    bumped = {user_id: _counters(db, user_id) for user_id in user_ids}
+    db.rebuild_stats()
+    assert {user_id: _counters(db, user_id) for user_id in user_ids} == bumped
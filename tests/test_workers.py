@@ -0,0 +1,22 @@
+from conftest import load
+
+workers = load("workers")
+main = load("main")
+
+def test_worker_update_queue_is_bounded(db):
+    application = main.build_application(with_jobs=False, with_updater=False, update_queue_size=workers.WORKER_PREFETCH)
+    assert application.update_queue.maxsize == workers.WORKER_PREFETCH
+    for _ in range(workers.WORKER_PREFETCH):
+        application.update_queue.put_nowait(object())
+    assert application.update_queue.full()
+
+def test_shard_for_spreads_sequential_ids():
+    for count in (2, 3, 4, 8):
+        shards = [workers.shard_for(user_id, count) for user_id in range(1_000_000, 1_010_000)]
+        assert set(shards) == set(range(count))
+        per_worker = [shards.count(index) for index in range(count)]
+        assert max(per_worker) - min(per_worker) < len(shards) * 0.02
+
+def test_shard_for_does_not_reduce_to_modulo():
+    # With the low bits, ids that are equal mod 4 would always share a worker
+    assert len({workers.shard_for(user_id, 4) for user_id in range(0, 4000, 4)}) == 4
@@ -0,0 +1,31 @@
+# /bot/utils/metrics.py
+
+# A tiny in-process metrics registry.
+# Counters only ever go up; gauges hold the last observed value.
+# Everything is also logged so the numbers show up even without a scraper.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+def increment(name: str, amount: int = 1):
+    """Adds `amount` to the counter `name`."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+    logger.info(f"metric {name} +{amount}")
+
+def set_gauge(name: str, value: float):
+    """Records the latest value for the gauge `name`."""
+    with _lock:
+        _gauges[name] = value
+    logger.info(f"metric {name} = {value}")
+
+def snapshot() -> dict:
+    """Returns a copy of all counters and gauges."""
+    with _lock:
+        return {'counters': dict(_counters), 'gauges': dict(_gauges)}
@@ -0,0 +1,168 @@
+# /bot/workers.py
+
+# Sharded multi-worker runtime.
+#
+# One front process long-polls Telegram and hands every update to one of N
+# worker processes, picked by hashing the sender's Telegram user id. All
+# updates from a user therefore land on the same worker, in order, so
+# ConversationHandler state and user_data stay local to that worker.
+#
+# Shared state lives in the database: settings are picked up through the
+# settings version (db.refresh_settings) and every task/proof decision is
+# re-checked against the tasks table. Only worker 0 schedules the periodic
+# jobs. Proof-timeout jobs stay with the worker that handled the proof; if the
+# owner reviews on another worker, the timeout still fires but finds the task
+# already reviewed and does nothing. On shutdown the front process flushes the
+# event outbox once, after every worker has stopped writing.
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from queue import Full
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT_SECONDS = 30
+JOB_OWNER_INDEX = 0 # The worker that runs the job queue's periodic jobs
+WORKER_PREFETCH = 10 # Updates a worker holds beyond its process queue; keeps that queue the real buffer
+SHUTDOWN_GRACE_SECONDS = 10 # On top of DRAIN_TIMEOUT_SECONDS, for Application.stop() and process exit
+
+def shard_for(user_id: int, workers: int) -> int:
+    """Maps a Telegram user id to a worker index, spreading sequential ids evenly."""
+    # Fibonacci hashing: multiply by 2^32 / golden ratio and keep 32 bits, then
+    # scale by `workers` and take the high bits. The low bits would make this
+    # plain user_id % workers whenever workers is a power of two.
+    return (((user_id * 2654435769) & 0xFFFFFFFF) * workers) >> 32
+
+def update_user_id(data: dict):
+    """The sender's user id from a raw update dict, or None for updates without one."""
+    for value in data.values():
+        if isinstance(value, dict):
+            sender = value.get('from') or value.get('user')
+            if isinstance(sender, dict) and 'id' in sender:
+                return sender['id']
+    return None
+
+# --- Worker ---
+def _worker_main(index: int, queue):
+    # Signals reach the whole process group; the front process decides when
+    # workers stop by sending the sentinel after the last routed update
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(
+        format=f"%(asctime)s - worker{index} - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
+    )
+    from .main import build_application
+    application = build_application(with_jobs=index == JOB_OWNER_INDEX, with_updater=False, update_queue_size=WORKER_PREFETCH)
+    asyncio.run(_serve(application, queue, index))
+
+async def _serve(application, queue, index: int):
+    from telegram import Update
+    from . import lifecycle
+
+    loop = asyncio.get_running_loop()
+    async with application:
+        await application.start()
+        logger.info(f"Worker {index} ready")
+        while True:
+            data = await loop.run_in_executor(None, queue.get)
+            if data is None: # Shutdown sentinel from the front process
+                break
+            # Waits while the bounded update queue is full, so a slow worker stops
+            # taking from its process queue and the front process's put() blocks
+            await application.update_queue.put(Update.de_json(data, application.bot))
+        # The front process flushes the outbox once all workers are done
+        await lifecycle.drain(application, flush_outbox=False)
+    logger.info(f"Worker {index} stopped")
+
+# --- Front ---
+async def _route_updates(queues: list, stop: asyncio.Event):
+    from telegram import Bot, Update
+
+    loop = asyncio.get_running_loop()
+    offset = None
+    async with Bot(config.BOT_TOKEN, base_url=config.BOT_API_URL) as bot:
+        try:
+            while not stop.is_set():
+                try:
+                    updates = await bot.get_updates(offset=offset, timeout=POLL_TIMEOUT_SECONDS, allowed_updates=Update.ALL_TYPES)
+                except Exception as e:
+                    logger.warning(f"Polling failed, retrying: {e}")
+                    await asyncio.sleep(1)
+                    continue
+
+                for update in updates:
+                    data = update.to_dict()
+                    user_id = update_user_id(data)
+                    shard = shard_for(user_id, len(queues)) if user_id is not None else JOB_OWNER_INDEX
+                    # put() blocks once a worker holds WORKER_QUEUE_SIZE + WORKER_PREFETCH updates,
+                    # which applies backpressure to polling and bounds what a crashed worker loses
+                    await loop.run_in_executor(None, queues[shard].put, data)
+                    offset = update.update_id + 1
+        finally:
+            if offset is not None:
+                # Confirm what was routed so Telegram doesn't resend it after a restart
+                await bot.get_updates(offset=offset, timeout=0)
+
+def run(worker_count: int):
+    """Runs the front process and `worker_count` sharded workers until SIGINT/SIGTERM."""
+    # Bootstrap the schema once here so workers never race on migrations
+    from .database import db
+    db.init_db()
+
+    ctx = multiprocessing.get_context('spawn')
+    queues = [ctx.Queue(maxsize=config.WORKER_QUEUE_SIZE) for _ in range(worker_count)]
+    processes = [
+        ctx.Process(target=_worker_main, args=(index, queue), name=f"bot-worker-{index}")
+        for index, queue in enumerate(queues)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {worker_count} workers, routing updates by user id")
+
+    async def front():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        router = asyncio.create_task(_route_updates(queues, stop))
+        await stop.wait()
+        router.cancel()
+        try:
+            await router
+        except asyncio.CancelledError:
+            pass
+
+    try:
+        asyncio.run(front())
+    finally:
+        # Workers drain in parallel, so they all share one deadline
+        deadline = time.monotonic() + config.DRAIN_TIMEOUT_SECONDS + SHUTDOWN_GRACE_SECONDS
+        # A worker with a full queue takes the stop signal once it catches up;
+        # retry all of them so one stuck worker doesn't hold up the others
+        pending = list(zip(queues, processes))
+        while pending:
+            waiting = []
+            for queue, process in pending:
+                try:
+                    queue.put_nowait(None)
+                except Full:
+                    waiting.append((queue, process))
+            pending = waiting
+            if pending and time.monotonic() >= deadline:
+                logger.warning(f"Could not ask {', '.join(process.name for _, process in pending)} to stop, their queues stayed full")
+                break
+            if pending:
+                time.sleep(0.1)
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"{process.name} did not drain in time, terminating it")
+                process.terminate()
+        logger.info("All workers stopped")
+        from . import lifecycle
+        lifecycle.flush_event_outbox()